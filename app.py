@@ -1,11 +1,107 @@
 import streamlit as st
-import matplotlib.pyplot as plt
 
-from core.metrics import compute_differences, compute_empirical_stats, compute_theoretical_stats
-from core.simulation import generate_population, simulate_sample_means
-from core.visualization import plot_population_hist, plot_sample_means_hist
-from utils.layout import render_controls, render_header
-from utils.report import build_pdf_report
+from core.metrics import compute_differences, compute_theoretical_stats
+from core.profiling import Profiler, profile_stage, use_profiler
+from utils.layout import (
+    render_advanced_controls,
+    render_controls,
+    render_convergence_panel,
+    render_header,
+    render_normality_diagnostics,
+    render_performance_panel,
+)
+from utils.pipeline import (
+    cache_stats,
+    get_convergence,
+    get_means_diagnostics,
+    get_means_png,
+    get_means_snapshot,
+    get_means_summary,
+    get_population_png,
+    get_population_summary,
+    get_report_status,
+    render_means_snapshot_png,
+    request_pdf_report,
+    start_sample_means,
+)
+
+
+def render_report_download(inputs, report_kwargs) -> None:
+    """
+    Boton para preparar el PDF (se genera en segundo plano solo si se pide) y, cuando esta listo, para descargarlo.
+    Mientras se genera, un fragmento consulta el estado cada segundo sin volver a ejecutar toda la app.
+    """
+    status, result = get_report_status(inputs)
+    if status == "listo":
+        st.download_button(
+            "Descargar reporte PDF",
+            data=result,
+            file_name="reporte_tcl.pdf",
+            mime="application/pdf",
+            help="Incluye parametros usados, graficas y metricas teoricas/empiricas.",
+            use_container_width=True,
+        )
+        return
+    if status == "error":
+        st.error(f"No se pudo generar el reporte: {result}")
+    if status in ("no_solicitado", "error"):
+        if st.button("Preparar reporte PDF", use_container_width=True):
+            request_pdf_report(inputs, **report_kwargs)
+            st.rerun()
+        return
+
+    # status == "generando"
+    if hasattr(st, "fragment"):
+
+        @st.fragment(run_every=1.0)
+        def poll() -> None:
+            st.caption("Generando reporte PDF...")
+            if get_report_status(inputs)[0] != "generando":
+                st.rerun()
+
+        poll()
+    else:
+        st.caption("Generando reporte PDF...")
+        st.button("Actualizar estado del reporte", use_container_width=True)
+
+
+def sync_means_run(run_inputs):
+    """
+    Corrida de medias en segundo plano de esta sesion para las entradas dadas (None si ya estan cacheadas).
+    Si las entradas cambiaron (p. ej. al arrastrar un slider) se cancela la corrida anterior antes de lanzar otra,
+    asi los cambios rapidos no acumulan trabajo.
+    """
+    state = st.session_state.get("means_run")
+    if state is not None:
+        previous_inputs, previous_run = state
+        if previous_inputs == run_inputs:
+            return previous_run
+        previous_run.cancel()
+    run = start_sample_means(*run_inputs)
+    st.session_state["means_run"] = (run_inputs, run) if run is not None else None
+    return run
+
+
+def render_means_progress(run, theoretical) -> None:
+    """
+    Medias parciales mientras avanza la corrida: un fragmento redibuja el histograma y las metricas cada
+    medio segundo sin volver a ejecutar toda la app; al terminar, un rerun completo muestra el resultado final.
+    """
+
+    @st.fragment(run_every=0.5)
+    def progress() -> None:
+        if run.done:
+            st.rerun()
+        st.progress(run.progress, text=f"Simulando medias: {run.n_done:,} de {run.n_simulations:,}")
+        summary = get_means_snapshot(run)
+        if summary is None:
+            return
+        st.image(render_means_snapshot_png(summary, theoretical), use_container_width=True)
+        mean_col, std_col = st.columns(2)
+        mean_col.metric("Media empirica parcial", f"{summary.moments.mean:.4f}")
+        std_col.metric("Desv. empirica parcial", f"{summary.moments.std:.4f}")
+
+    progress()
 
 
 def main() -> None:
@@ -63,98 +159,127 @@ def main() -> None:
 
     # Controles en la barra lateral nativa
     dist_name, dist_params, sample_size, n_simulations, population_size = render_controls()
+    advanced = render_advanced_controls()
+    seed, n_workers = advanced["seed"], advanced["n_workers"]
+    # Sin el panel de rendimiento no hay profiler activo y la instrumentacion no mide nada.
+    profiler = Profiler() if advanced["profile"] else None
 
-    with st.spinner("Actualizando simulacion..."):
-        population = generate_population(dist_name, dist_params, population_size)
-        sample_means = simulate_sample_means(dist_name, dist_params, sample_size, n_simulations)
-
-        pop_empirical = compute_empirical_stats(population)
-        sample_empirical = compute_empirical_stats(sample_means)
+    # Cada etapa esta cacheada por sus propias entradas; un rerun sin cambios relevantes no recalcula nada.
+    with use_profiler(profiler), st.spinner("Actualizando simulacion..."):
+        # Histogramas y momentos salen de una sola pasada por los datos (ver core.histogram).
+        pop_summary = get_population_summary(dist_name, dist_params, population_size, seed)
         theoretical = compute_theoretical_stats(dist_name, dist_params, sample_size)
 
-        pop_diff = compute_differences({"mean": theoretical["mean"], "std": theoretical["std"]}, pop_empirical)
-        means_diff = {
-            "mean": abs(sample_empirical["mean"] - theoretical["mean"]),
-            "std": abs(sample_empirical["std"] - theoretical["se"]),
-        }
+        # Las medias se generan en segundo plano: mientras avanza la corrida se muestran resultados parciales.
+        means_run = sync_means_run((dist_name, dist_params, sample_size, n_simulations, seed, n_workers))
+        means_pending = means_run is not None and not means_run.done
+        if means_pending and not hasattr(st, "fragment"):
+            # Sin fragmentos no hay refresco parcial: se espera el final como antes.
+            means_run.result()
+            means_pending = False
 
         col1, col2 = st.columns(2)
         with col1:
             st.markdown("**Distribucion poblacional sintetica**")
             st.caption("Refleja la forma original definida por los parametros elegidos.")
-            fig_population = plot_population_hist(population, dist_name, dist_params)
-            st.pyplot(fig_population, clear_figure=False, use_container_width=True)
+            png_population = get_population_png(dist_name, dist_params, population_size, seed)
+            with profile_stage("streamlit.image"):
+                st.image(png_population, use_container_width=True)
 
         with col2:
             st.markdown("**Distribucion de medias muestrales**")
             st.caption("La curva naranja muestra la normal teorica segun el TCL.")
-            fig_means = plot_sample_means_hist(
-                sample_means, theoretical_mean=theoretical["mean"], theoretical_se=theoretical["se"]
-            )
-            st.pyplot(fig_means, clear_figure=False, use_container_width=True)
-
-        st.markdown("---")
-        st.subheader("Metricas teoricas vs empiricas")
-
-        pop_col, means_col = st.columns(2)
-        with pop_col:
-            st.markdown("**Poblacion generada**")
-            st.metric("Media teorica", f"{theoretical['mean']:.4f}")
-            st.metric("Desviacion teorica", f"{theoretical['std']:.4f}")
-            st.metric("Media empirica", f"{pop_empirical['mean']:.4f}", f"-{pop_diff.get('mean', 0):.4f}")
-            st.metric(
-                "Desv. empirica",
-                f"{pop_empirical['std']:.4f}",
-                f"-{pop_diff.get('std', 0):.4f}",
-            )
+            if means_pending:
+                render_means_progress(means_run, theoretical)
+            else:
+                png_means = get_means_png(
+                    dist_name, dist_params, sample_size, n_simulations, seed, theoretical, n_workers
+                )
+                with profile_stage("streamlit.image"):
+                    st.image(png_means, use_container_width=True)
 
-        with means_col:
-            st.markdown("**Medias muestrales**")
-            st.metric("Media teorica (igual a poblacion)", f"{theoretical['mean']:.4f}")
-            st.metric("Error estandar teorico", f"{theoretical['se']:.4f}")
-            st.metric(
-                "Media empirica de medias",
-                f"{sample_empirical['mean']:.4f}",
-                f"-{means_diff['mean']:.4f}",
-            )
-            st.metric(
-                "Desv. empirica de medias",
-                f"{sample_empirical['std']:.4f}",
-                f"-{means_diff['std']:.4f}",
+        if means_pending:
+            st.caption("Las metricas, los diagnosticos y el reporte aparecen al terminar la simulacion de medias.")
+        else:
+            means_summary = get_means_summary(dist_name, dist_params, sample_size, n_simulations, seed, n_workers)
+
+            # Momentos y percentiles (estos ultimos del sketch de cuantiles de cada resumen).
+            pop_empirical = pop_summary.stats()
+            sample_empirical = means_summary.stats()
+
+            pop_diff = compute_differences({"mean": theoretical["mean"], "std": theoretical["std"]}, pop_empirical)
+            means_diff = {
+                "mean": abs(sample_empirical["mean"] - theoretical["mean"]),
+                "std": abs(sample_empirical["std"] - theoretical["se"]),
+            }
+
+            st.markdown("---")
+            st.subheader("Metricas teoricas vs empiricas")
+
+            pop_col, means_col = st.columns(2)
+            with pop_col:
+                st.markdown("**Poblacion generada**")
+                st.metric("Media teorica", f"{theoretical['mean']:.4f}")
+                st.metric("Desviacion teorica", f"{theoretical['std']:.4f}")
+                st.metric("Media empirica", f"{pop_empirical['mean']:.4f}", f"-{pop_diff.get('mean', 0):.4f}")
+                st.metric(
+                    "Desv. empirica",
+                    f"{pop_empirical['std']:.4f}",
+                    f"-{pop_diff.get('std', 0):.4f}",
+                )
+
+            with means_col:
+                st.markdown("**Medias muestrales**")
+                st.metric("Media teorica (igual a poblacion)", f"{theoretical['mean']:.4f}")
+                st.metric("Error estandar teorico", f"{theoretical['se']:.4f}")
+                st.metric(
+                    "Media empirica de medias",
+                    f"{sample_empirical['mean']:.4f}",
+                    f"-{means_diff['mean']:.4f}",
+                )
+                st.metric(
+                    "Desv. empirica de medias",
+                    f"{sample_empirical['std']:.4f}",
+                    f"-{means_diff['std']:.4f}",
+                )
+
+            diagnostics = get_means_diagnostics(dist_name, dist_params, sample_size, n_simulations, seed, n_workers)
+            render_normality_diagnostics(diagnostics)
+
+            render_convergence_panel(lambda: get_convergence(dist_name, dist_params, n_simulations, seed))
+
+            # El PDF ya no se arma en cada rerun: se genera en segundo plano cuando se pide y queda cacheado.
+            render_report_download(
+                inputs={
+                    "dist_name": dist_name,
+                    "dist_params": dist_params,
+                    "sample_size": sample_size,
+                    "n_simulations": n_simulations,
+                    "population_size": population_size,
+                    "seed": seed,
+                },
+                report_kwargs={
+                    "pop_empirical": pop_empirical,
+                    "sample_empirical": sample_empirical,
+                    "theoretical": theoretical,
+                    "pop_diff": pop_diff,
+                    "means_diff": means_diff,
+                    "diagnostics": diagnostics,
+                    "fig_population": png_population,
+                    "fig_means": png_means,
+                },
             )
+            # Los PNG de las figuras quedan en el cache de utils.pipeline; las figuras se reutilizan entre graficos.
 
-        report_bytes = build_pdf_report(
-            inputs={
-                "dist_name": dist_name,
-                "dist_params": dist_params,
-                "sample_size": sample_size,
-                "n_simulations": n_simulations,
-                "population_size": population_size,
-            },
-            pop_empirical=pop_empirical,
-            sample_empirical=sample_empirical,
-            theoretical=theoretical,
-            pop_diff=pop_diff,
-            means_diff=means_diff,
-            fig_population=fig_population,
-            fig_means=fig_means,
-        )
-        st.download_button(
-            "Descargar reporte PDF",
-            data=report_bytes,
-            file_name="reporte_tcl.pdf",
-            mime="application/pdf",
-            help="Incluye parametros usados, graficas y metricas teoricas/empiricas.",
-            use_container_width=True,
-        )
-        # Cerramos figuras para no acumular memoria en cada recomputo.
-        plt.close(fig_population)
-        plt.close(fig_means)
+            st.markdown(
+                "Al aumentar `n`, la dispersion de las medias disminuye y la curva normal se vuelve mas angosta. "
+                "Incluso cuando la poblacion es sesgada, las medias muestrales se acercan a la forma normal "
+                "gracias al TCL."
+            )
 
-        st.markdown(
-            "Al aumentar `n`, la dispersion de las medias disminuye y la curva normal se vuelve mas angosta. "
-            "Incluso cuando la poblacion es sesgada, las medias muestrales se acercan a la forma normal gracias al TCL."
-        )
+    if profiler is not None:
+        profiler.close()
+        render_performance_panel(profiler, cache_stats())
 
 
 if __name__ == "__main__":
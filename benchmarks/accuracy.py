@@ -0,0 +1,141 @@
+"""
+Control de precision del modo compacto (precision="single") frente a la linea base en float64.
+Tres comprobaciones por familia del registro:
+- muestreador: los datos de sampler(..., dtype=np.float32) son compactos (float32 o enteros de 4 bytes o menos) y
+  finitos. Las familias que generan en 64 bits y convierten al final (native_single=False) deben dar, con la misma
+  semilla, exactamente los valores float64 convertidos, y la media cambia a lo sumo el redondeo de float32
+  (2^-24 * media(|x|)). Las que generan en float32 usan otro flujo de valores: su media y desviacion deben quedar
+  dentro de Z_TOL errores estandar de las de la corrida float64 con la misma semilla;
+- acumulacion: la media por fila acumulada en float64 de las muestras float32 (como hace la simulacion) se compara
+  con la media exacta (math.fsum); se muestra tambien el error de acumular en float32, que es el que se evita;
+- equivalencia estadistica: la media y la desviacion de las medias simuladas en cada precision quedan
+  dentro de Z_TOL errores estandar de los valores teoricos del TCL.
+
+Uso (desde la raiz del repositorio):
+    python -m benchmarks.accuracy [--simulations 50000]
+
+Termina con codigo 1 si alguna comprobacion falla.
+"""
+import argparse
+import math
+import sys
+from typing import Any, Dict, List
+
+import numpy as np
+
+from core.distributions import available_distributions, get_distribution
+from core.metrics import RunningMoments, compute_theoretical_stats
+from core.simulation import simulate_sample_means
+
+SEED = 12345
+SAMPLE_SIZES = [5, 100]
+# Filas y largo de las muestras de las comprobaciones del muestreador y de acumulacion.
+SAMPLER_ROWS = 2_000
+SAMPLER_SAMPLE_SIZE = 2_000
+# Holgura sobre la cota de redondeo por el error de la suma en float64.
+ROUNDING_SLACK = 1.01
+ACCUMULATION_TOL = 1e-12
+Z_TOL = 5.0
+# Parametros distintos de los del registro: con alpha = 3 la Pareto no tiene cuarto momento y la desviacion
+# de las medias converge demasiado lento para una comprobacion con tolerancia fija.
+PARAM_OVERRIDES = {"Pareto": {"alpha": 5.0, "xm": 1.0}}
+
+
+def _params(dist_name: str) -> Dict[str, float]:
+    return PARAM_OVERRIDES.get(dist_name, get_distribution(dist_name).default_params())
+
+
+def check_sampler(dist_name: str, dist_params: Dict[str, float]) -> Dict[str, Any]:
+    """Compara sampler(..., dtype=np.float32) con la corrida float64 de la misma semilla y mide la acumulacion."""
+    spec = get_distribution(dist_name)
+    shape = (SAMPLER_ROWS, SAMPLER_SAMPLE_SIZE)
+    compact = spec.sampler(**dist_params, size=shape, rng=np.random.default_rng(SEED), dtype=np.float32)
+    double = spec.sampler(**dist_params, size=shape, rng=np.random.default_rng(SEED), dtype=np.float64)
+    row: Dict[str, Any] = {"dtype": compact.dtype.name}
+    row["compact"] = compact.dtype.itemsize <= 4 and bool(np.isfinite(compact).all())
+
+    mean32 = float(compact.mean(dtype=np.float64))
+    mean64 = float(double.mean(dtype=np.float64))
+    if not spec.native_single:
+        # Mismo flujo que float64: los valores deben ser los convertidos y la media cambiar a lo sumo el redondeo.
+        row["same_values"] = bool(np.array_equal(compact, double.astype(compact.dtype)))
+        bound = 2.0**-24 * float(np.abs(double).mean(dtype=np.float64))
+        row["deviation"] = abs(mean32 - mean64) / bound if bound > 0 else 0.0
+        row["deviation_tol"] = ROUNDING_SLACK
+    else:
+        # Otro flujo de valores: media y desviacion comparadas en errores estandar (ver check_equivalence).
+        row["same_values"] = True
+        m32, m64 = RunningMoments.from_array(compact), RunningMoments.from_array(double)
+        n = compact.size
+        z_mean = abs(m32.mean - m64.mean) / np.sqrt((m32.std**2 + m64.std**2) / n)
+        se_std = np.sqrt(sum(m.std**2 * max(m.kurtosis + 2.0, 0.0) / (4.0 * n) for m in (m32, m64)))
+        row["deviation"] = float(max(z_mean, abs(m32.std - m64.std) / se_std))
+        row["deviation_tol"] = Z_TOL
+
+    # Media exacta de cada fila de valores float32 (math.fsum no redondea sumas intermedias).
+    exact = np.array([math.fsum(values) for values in compact.astype(np.float64)]) / SAMPLER_SAMPLE_SIZE
+    scale = np.maximum(np.abs(exact), np.finfo(np.float64).tiny)
+    row["acc64"] = float(np.max(np.abs(compact.mean(axis=1, dtype=np.float64) - exact) / scale))
+    # Referencia de lo que se evita: suma secuencial en float32 (np.cumsum no usa suma por pares).
+    sequential = np.cumsum(compact, axis=1, dtype=np.float32)[:, -1] / np.float32(SAMPLER_SAMPLE_SIZE)
+    row["acc32"] = float(np.max(np.abs(sequential - exact) / scale))
+    return row
+
+
+def check_equivalence(dist_name: str, dist_params: Dict[str, float], sample_size: int, k: int) -> Dict[str, float]:
+    """Distancia (en errores estandar) de la media y la desviacion de las medias a la teoria, por precision."""
+    theoretical = compute_theoretical_stats(dist_name, dist_params, sample_size)
+    row: Dict[str, float] = {}
+    for precision in ("double", "single"):
+        means = simulate_sample_means(dist_name, dist_params, sample_size, k, rng=SEED, precision=precision)
+        moments = RunningMoments.from_array(means)
+        se_mean = theoretical["se"] / np.sqrt(k)
+        # Error estandar de la desviacion muestral: depende de la curtosis de las medias.
+        se_std = moments.std * np.sqrt(max(moments.kurtosis + 2.0, 0.0) / (4.0 * k))
+        row[f"z_mean_{precision}"] = abs(moments.mean - theoretical["mean"]) / se_mean
+        row[f"z_std_{precision}"] = abs(moments.std - theoretical["se"]) / se_std
+    return row
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Precision del modo float32 frente a float64.")
+    parser.add_argument("--simulations", type=int, default=50_000, help="Medias por configuracion (k).")
+    args = parser.parse_args(argv)
+
+    failures: List[str] = []
+    print(f"{'distribucion':<16} {'dtype':>8} {'desvio/tol':>11} {'acum. float64':>14} {'acum. float32':>14}")
+    for dist_name in available_distributions():
+        row = check_sampler(dist_name, _params(dist_name))
+        print(
+            f"{dist_name:<16} {row['dtype']:>8} {row['deviation']:5.2f}/{row['deviation_tol']:<5.2f} "
+            f"{row['acc64']:14.2e} {row['acc32']:14.2e}"
+        )
+        if not row["compact"]:
+            failures.append(f"compacto[{dist_name}]")
+        if not row["same_values"] or row["deviation"] > row["deviation_tol"]:
+            failures.append(f"muestreador[{dist_name}]")
+        if row["acc64"] > ACCUMULATION_TOL:
+            failures.append(f"acumulacion[{dist_name}]")
+
+    print(f"\n{'configuracion':<28} {'z media f64':>12} {'z media f32':>12} {'z desv f64':>11} {'z desv f32':>11}")
+    for dist_name in available_distributions():
+        dist_params = _params(dist_name)
+        for sample_size in SAMPLE_SIZES:
+            row = check_equivalence(dist_name, dist_params, sample_size, args.simulations)
+            case_id = f"{dist_name},n={sample_size}"
+            print(
+                f"{case_id:<28} {row['z_mean_double']:12.2f} {row['z_mean_single']:12.2f} "
+                f"{row['z_std_double']:11.2f} {row['z_std_single']:11.2f}"
+            )
+            if row["z_mean_single"] > Z_TOL or row["z_std_single"] > Z_TOL:
+                failures.append(f"equivalencia[{case_id}]")
+
+    if failures:
+        print(f"\nERROR: {len(failures)} comprobacion(es) fuera de tolerancia: {', '.join(failures)}")
+        return 1
+    print("\nTodas las comprobaciones dentro de tolerancia.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
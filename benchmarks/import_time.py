@@ -0,0 +1,78 @@
+"""
+Benchmark del tiempo de importacion en frio de los modulos de la app.
+Cada modulo se importa en un interprete nuevo (sin caches de modulos compartidos) y se reporta la mediana
+de varias repeticiones junto con las dependencias pesadas que quedaron cargadas.
+
+Uso (desde la raiz del repositorio):
+    python -m benchmarks.import_time [--repeat 5]
+
+Termina con codigo 1 si una ruta headless (core.simulation, core.metrics) carga matplotlib, scipy o reportlab.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "core.simulation",
+    "core.metrics",
+    "core.visualization",
+    "utils.report",
+    "utils.pipeline",
+]
+HEAVY_MODULES = ["matplotlib", "scipy", "reportlab", "streamlit"]
+# Modulos que se usan sin interfaz grafica y no deben arrastrar dependencias de graficos ni PDF.
+HEADLESS_MODULES = ["core.simulation", "core.metrics"]
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure_import(module: str, repeat: int = 5) -> Dict[str, object]:
+    """Mediana del tiempo de `import module` en procesos nuevos y dependencias pesadas cargadas."""
+    timings: List[float] = []
+    heavy: List[str] = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        heavy = result["heavy"]
+    return {"module": module, "seconds": statistics.median(timings), "heavy": heavy}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tiempo de importacion en frio de los modulos.")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por modulo (se reporta la mediana).")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in MODULES:
+        result = measure_import(module, args.repeat)
+        heavy = ", ".join(result["heavy"]) or "-"
+        print(f"{module:<22} {result['seconds'] * 1000:8.1f} ms   pesados: {heavy}")
+        if module in HEADLESS_MODULES and result["heavy"]:
+            failed = True
+    if failed:
+        print("ERROR: una ruta headless importa dependencias de graficos o PDF.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
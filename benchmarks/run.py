@@ -0,0 +1,297 @@
+"""
+Benchmarks de las etapas principales: generacion de poblacion, simulacion de medias, metricas, graficos y PDF.
+Cada caso se ejecuta sobre una grilla de parametros para DISTRIBUTIONS (Uniforme, sin muestreador exacto de la media,
+y Exponencial y Binomial, con el; las demas familias del registro no entran en la grilla) y registra el tiempo de pared
+(mediana y minimo de varias repeticiones), el pico de memoria asignada (tracemalloc, que numpy reporta) y el
+aumento de RSS del proceso durante el caso. Los resultados se pueden guardar como linea base y comparar en corridas
+posteriores.
+
+Uso (desde la raiz del repositorio):
+    python -m benchmarks.run [--quick] [--filter simulate] [--save base.json] [--compare base.json]
+
+Con --compare termina con codigo 1 si algun caso es mas lento que la linea base por encima de --threshold.
+"""
+import argparse
+import fnmatch
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core.metrics import compute_empirical_stats, compute_theoretical_stats
+from core.simulation import generate_population, simulate_sample_means, summarize_population
+from core.visualization import POPULATION_BINS
+
+DISTRIBUTIONS = [
+    ("Uniforme", {"a": 0.0, "b": 5.0}),
+    ("Exponencial", {"lam": 1.0}),
+    ("Binomial", {"n_trials": 20, "p": 0.3}),
+]
+
+FULL_GRID = {
+    "population_size": [10_000, 200_000, 2_000_000],
+    "sample_size": [10, 100, 500],
+    "n_simulations": [1_000, 10_000, 100_000],
+}
+QUICK_GRID = {
+    "population_size": [10_000, 200_000],
+    "sample_size": [10, 100],
+    "n_simulations": [1_000, 10_000],
+}
+
+SEED = 12345
+
+Case = Tuple[str, Callable[[], Callable[[], Any]]]
+
+
+def _close(fig) -> None:
+    import matplotlib.pyplot as plt
+
+    plt.close(fig)
+
+
+def iter_cases(grid: Dict[str, List[int]]) -> Iterator[Case]:
+    """
+    Genera (id, preparar) por caso. preparar() construye las entradas fuera de la medicion y devuelve
+    la funcion a cronometrar.
+    """
+    for dist_name, dist_params in DISTRIBUTIONS:
+        for size in grid["population_size"]:
+            yield (
+                f"generate_population[{dist_name},N={size}]",
+                lambda d=dist_name, p=dist_params, s=size: lambda: generate_population(d, p, s, rng=SEED),
+            )
+
+            def prepare_stats(d=dist_name, p=dist_params, s=size):
+                data = generate_population(d, p, s, rng=SEED)
+                return lambda: compute_empirical_stats(data)
+
+            yield f"compute_empirical_stats[{dist_name},N={size}]", prepare_stats
+
+            def prepare_population_plot(d=dist_name, p=dist_params, s=size):
+                from core.visualization import plot_population_hist
+
+                data = generate_population(d, p, s, rng=SEED)
+                return lambda: _close(plot_population_hist(data, d, p))
+
+            yield f"plot_population_hist[{dist_name},N={size}]", prepare_population_plot
+            yield (
+                f"summarize_population[{dist_name},N={size}]",
+                lambda d=dist_name, p=dist_params, s=size: lambda: summarize_population(
+                    d, p, s, POPULATION_BINS, rng=SEED
+                ),
+            )
+
+        for n in grid["sample_size"]:
+            for k in grid["n_simulations"]:
+                for fast_path in (False, True):
+                    name = "simulate_sample_means_fast" if fast_path else "simulate_sample_means"
+                    yield (
+                        f"{name}[{dist_name},n={n},k={k}]",
+                        lambda d=dist_name, p=dist_params, n=n, k=k, f=fast_path: lambda: simulate_sample_means(
+                            d, p, n, k, fast_path=f, rng=SEED
+                        ),
+                    )
+                yield (
+                    f"simulate_sample_means_single[{dist_name},n={n},k={k}]",
+                    lambda d=dist_name, p=dist_params, n=n, k=k: lambda: simulate_sample_means(
+                        d, p, n, k, rng=SEED, precision="single"
+                    ),
+                )
+
+            k = grid["n_simulations"][-1]
+
+            # Los dos casos de la figura de medias llegan hasta el PNG (figure_to_png), como en la app, para que
+            # comparen el mismo trabajo: figura nueva por llamada contra figura reutilizada.
+            def prepare_means_plot(d=dist_name, p=dist_params, n=n, k=k):
+                from core.visualization import plot_sample_means_hist
+                from utils.report import figure_to_png
+
+                means = simulate_sample_means(d, p, n, k, rng=SEED)
+                theoretical = compute_theoretical_stats(d, p, n)
+
+                def run():
+                    fig = plot_sample_means_hist(means, theoretical["mean"], theoretical["se"])
+                    figure_to_png(fig)
+                    _close(fig)
+
+                return run
+
+            yield f"plot_sample_means_hist[{dist_name},n={n},k={k}]", prepare_means_plot
+
+            def prepare_means_render(d=dist_name, p=dist_params, n=n, k=k):
+                from core.histogram import summarize_array
+                from core.visualization import SAMPLE_MEANS_BINS, SampleMeansFigure
+                from utils.report import figure_to_png
+
+                summary = summarize_array(simulate_sample_means(d, p, n, k, rng=SEED), SAMPLE_MEANS_BINS)
+                theoretical = compute_theoretical_stats(d, p, n)
+                renderer = SampleMeansFigure()
+                # Figura reutilizada: se miden la actualizacion de artistas y el PNG.
+                return lambda: figure_to_png(renderer.render(summary, theoretical["mean"], theoretical["se"]))
+
+            yield f"render_sample_means_figure[{dist_name},n={n},k={k}]", prepare_means_render
+
+        def prepare_report(d=dist_name, p=dist_params):
+            from core.visualization import plot_population_hist, plot_sample_means_hist
+            from utils.report import build_pdf_report
+
+            n, k, size = 40, 1_000, 100_000
+            population = generate_population(d, p, size, rng=SEED)
+            means = simulate_sample_means(d, p, n, k, rng=SEED)
+            theoretical = compute_theoretical_stats(d, p, n)
+            pop_empirical = compute_empirical_stats(population)
+            sample_empirical = compute_empirical_stats(means)
+            fig_population = plot_population_hist(population, d, p)
+            fig_means = plot_sample_means_hist(means, theoretical["mean"], theoretical["se"])
+            inputs = {
+                "dist_name": d,
+                "dist_params": p,
+                "sample_size": n,
+                "n_simulations": k,
+                "population_size": size,
+                "seed": SEED,
+            }
+            return lambda: build_pdf_report(
+                inputs=inputs,
+                pop_empirical=pop_empirical,
+                sample_empirical=sample_empirical,
+                theoretical=theoretical,
+                pop_diff={},
+                means_diff={"mean": 0.0, "std": 0.0},
+                fig_population=fig_population,
+                fig_means=fig_means,
+            )
+
+        yield f"build_pdf_report[{dist_name}]", prepare_report
+
+
+def _rss_status() -> Dict[str, int]:
+    """RSS actual (VmRSS) y pico (VmHWM) del proceso en bytes, leidos de /proc (solo Linux)."""
+    values = {}
+    with open("/proc/self/status", encoding="ascii") as handle:
+        for line in handle:
+            name, _, rest = line.partition(":")
+            if name in ("VmRSS", "VmHWM"):
+                values[name] = int(rest.split()[0]) * 1024
+    return values
+
+
+def _reset_peak_rss() -> bool:
+    """
+    Reinicia el pico de RSS del proceso al RSS actual (escribir "5" en /proc/self/clear_refs, Linux >= 4.0).
+    ru_maxrss no sirve por caso: es el pico de toda la vida del proceso y solo puede crecer entre casos.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as handle:
+            handle.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def measure_rss_delta(func: Callable[[], Any]) -> Optional[int]:
+    """Cuanto sube el pico de RSS por encima del RSS previo durante una corrida, o None si no se puede medir."""
+    gc.collect()
+    if not _reset_peak_rss():
+        return None
+    before = _rss_status()["VmRSS"]
+    func()
+    return max(0, _rss_status()["VmHWM"] - before)
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Tiempo (sin tracemalloc, que lo distorsiona) y luego corridas aparte para el aumento de RSS y para el pico
+    de memoria asignada. Ambas medidas son del caso y no dependen de los casos que se corrieron antes.
+    """
+    func()  # calentamiento: imports perezosos y caches de primera llamada
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    rss_delta = measure_rss_delta(func)
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "peak_alloc_bytes": int(peak),
+        "rss_delta_bytes": rss_delta,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Casos cuyo tiempo minimo supera al de la linea base por mas de `threshold` veces."""
+    regressions = []
+    for case_id, result in results.items():
+        base = baseline.get(case_id)
+        if base is None:
+            continue
+        ratio = result["min_s"] / base["min_s"] if base["min_s"] > 0 else float("inf")
+        marker = "  REGRESION" if ratio > threshold else ""
+        print(f"  {case_id:<60} {ratio:6.2f}x{marker}")
+        if ratio > threshold:
+            regressions.append(case_id)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de simulacion, metricas, graficos y PDF.")
+    parser.add_argument("--quick", action="store_true", help="Grilla reducida para corridas rapidas.")
+    parser.add_argument("--filter", default="*", help="Patron (fnmatch) sobre el id de los casos.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones cronometradas por caso.")
+    parser.add_argument("--save", help="Guarda los resultados como JSON (linea base).")
+    parser.add_argument("--compare", help="JSON de linea base contra el cual comparar.")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Factor de lentitud que cuenta como regresion.")
+    args = parser.parse_args(argv)
+
+    grid = QUICK_GRID if args.quick else FULL_GRID
+    pattern = args.filter if any(ch in args.filter for ch in "*?[") else f"*{args.filter}*"
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'caso':<60} {'mediana':>10} {'minimo':>10} {'pico alloc':>12} {'delta RSS':>10}")
+    for case_id, prepare in iter_cases(grid):
+        if not fnmatch.fnmatch(case_id, pattern):
+            continue
+        result = measure(prepare(), args.repeat)
+        results[case_id] = result
+        rss = result["rss_delta_bytes"]
+        rss_text = f"{rss / 2**20:8.1f}MB" if rss is not None else f"{'-':>10}"
+        print(
+            f"{case_id:<60} {result['median_s'] * 1000:8.1f}ms {result['min_s'] * 1000:8.1f}ms "
+            f"{result['peak_alloc_bytes'] / 2**20:10.1f}MB {rss_text}"
+        )
+
+    if args.save:
+        payload = {
+            "machine": {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform()},
+            "results": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)["results"]
+        print(f"\nComparacion contra {args.compare} (tiempo minimo, umbral {args.threshold:.2f}x):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} caso(s) con regresion.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
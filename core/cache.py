@@ -0,0 +1,196 @@
+"""
+Cache en memoria con expulsion LRU (menos usado recientemente) y presupuesto de bytes.
+Las claves se canonizan para que entradas equivalentes (p. ej. el mismo diccionario de parametros
+con otro orden o tipos numpy en lugar de Python) apunten a la misma entrada.
+El cache es seguro entre hilos, asi que una sola instancia a nivel de modulo sirve a todas las sesiones de
+un proceso; get_or_compute ademas deduplica los calculos concurrentes de una misma clave (single-flight).
+"""
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+
+def _canonical(value: Any) -> Hashable:
+    """Convierte un valor a una forma hashable y estable."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _canonical(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_canonical(v) for v in value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.random.SeedSequence):
+        return ("SeedSequence", _canonical(value.entropy), value.spawn_key)
+    return value
+
+
+def make_key(*parts: Any) -> Hashable:
+    """Clave canonica a partir de las entradas que determinan un resultado."""
+    return _canonical(parts)
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Estimacion del tamano en memoria de un valor cacheado (usa el atributo nbytes si existe)."""
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Cache LRU acotado por bytes (max_bytes) y opcionalmente por numero de entradas (max_entries).
+    on_evict se invoca con cada valor expulsado, util para liberar recursos (p. ej. cerrar figuras).
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        max_entries: Optional[int] = None,
+        on_evict: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes debe ser positivo.")
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        # Calculos en curso de get_or_compute: los pedidos concurrentes de la misma clave esperan su Future.
+        self._inflight: Dict[Hashable, Future] = {}
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Devuelve el valor y lo marca como usado recientemente."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any, nbytes: Optional[int] = None) -> None:
+        """
+        Guarda un valor; los valores mayores que max_bytes no se cachean. Volver a guardar la misma clave actualiza
+        su tamano (p. ej. un arreglo que crecio); si ya no entra en el presupuesto, la entrada anterior se expulsa.
+        """
+        size = estimate_nbytes(value) if nbytes is None else nbytes
+        if size > self.max_bytes:
+            with self._lock:
+                evicted = []
+                if key in self._entries:
+                    self._nbytes -= self._sizes.pop(key)
+                    evicted.append(self._entries.pop(key))
+            self._notify(evicted)
+            return
+        with self._lock:
+            evicted = []
+            if key in self._entries:
+                self._nbytes -= self._sizes[key]
+                old = self._entries.pop(key)
+                if old is not value:
+                    evicted.append(old)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._nbytes += size
+            evicted.extend(self._evict())
+        self._notify(evicted)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Devuelve el valor cacheado o lo calcula con compute() y lo guarda.
+        Single-flight: si otro hilo ya esta calculando la misma clave, se espera ese resultado en lugar de
+        repetir el calculo (cuenta en shared). Si el calculo falla, la excepcion llega a todos los que esperaban
+        y no se cachea nada.
+        """
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            flight = self._inflight.get(key)
+            owner = flight is None
+            if owner:
+                self.misses += 1
+                flight = self._inflight[key] = Future()
+            else:
+                self.shared += 1
+        if not owner:
+            return flight.result()
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.set_exception(exc)
+            raise
+        # Primero se guarda y despues se retira el calculo en curso: un pedido nuevo ve uno de los dos.
+        self.put(key, value)
+        with self._lock:
+            self._inflight.pop(key, None)
+        flight.set_result(value)
+        return value
+
+    @property
+    def in_flight(self) -> int:
+        """Claves que se estan calculando en este momento."""
+        return len(self._inflight)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "nbytes": self._nbytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared": self.shared,
+            "in_flight": self.in_flight,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            evicted = list(self._entries.values())
+            self._entries.clear()
+            self._sizes.clear()
+            self._nbytes = 0
+        self._notify(evicted)
+
+    def _evict(self) -> list:
+        """Expulsa las entradas menos usadas hasta respetar los limites (se llama con el lock tomado)."""
+        evicted = []
+        while self._entries and (
+            self._nbytes > self.max_bytes or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            key, value = self._entries.popitem(last=False)
+            self._nbytes -= self._sizes.pop(key)
+            evicted.append(value)
+        return evicted
+
+    def _notify(self, evicted: list) -> None:
+        if self.on_evict is None:
+            return
+        for value in evicted:
+            self.on_evict(value)
@@ -0,0 +1,47 @@
+"""
+Estudio de convergencia del TCL: como cambia la distribucion de las medias muestrales al crecer n.
+En lugar de una simulacion por cada n, simulate_convergence genera una sola vez k filas de longitud n_max
+(core.simulation.simulate_prefix_means) y resume cada prefijo: desviacion empirica frente al error estandar
+teorico, asimetria, curtosis y distancia de Kolmogorov-Smirnov a la normal del TCL.
+"""
+from typing import Dict, List, Optional, Sequence
+
+from core.metrics import RunningMoments, compute_theoretical_stats, ks_distance_normal
+from core.rng import SeedLike
+from core.simulation import DEFAULT_CHUNK_BYTES, simulate_prefix_means
+
+DEFAULT_N_VALUES = (1, 2, 5, 10, 20, 30, 50, 100, 200, 500)
+
+
+def simulate_convergence(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    n_values: Optional[Sequence[int]] = None,
+    n_simulations: int = 10_000,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    rng: SeedLike = None,
+) -> List[Dict[str, float]]:
+    """
+    Una fila por n (en orden creciente) con las claves: n, mean, std, se, std_ratio (std / se),
+    skewness, kurtosis (en exceso) y ks (distancia a normal(mean teorica, se)).
+    El costo es el de una simulacion con n = max(n_values) en lugar de una por cada n.
+    """
+    n_values = sorted(set(int(n) for n in (n_values or DEFAULT_N_VALUES)))
+    means = simulate_prefix_means(dist_name, dist_params, n_values, n_simulations, chunk_bytes, rng=rng)
+    rows = []
+    for n, sample_means in zip(n_values, means):
+        theoretical = compute_theoretical_stats(dist_name, dist_params, n)
+        moments = RunningMoments.from_array(sample_means)
+        rows.append(
+            {
+                "n": n,
+                "mean": float(moments.mean),
+                "std": moments.std,
+                "se": float(theoretical["se"]),
+                "std_ratio": float(moments.std / theoretical["se"]) if theoretical["se"] > 0 else float("nan"),
+                "skewness": moments.skewness,
+                "kurtosis": moments.kurtosis,
+                "ks": ks_distance_normal(sample_means, theoretical["mean"], theoretical["se"]),
+            }
+        )
+    return rows
@@ -0,0 +1,111 @@
+"""
+Estimacion de densidad por nucleo (KDE) gaussiano con binning lineal y convolucion por FFT.
+Equivale a scipy.stats.gaussian_kde en una dimension (mismo ancho de banda Scott/Silverman), pero en lugar
+de evaluar N nucleos en cada punto (O(N * puntos)) reparte los datos en una grilla fija y convoluciona
+(O(N + G log G)), lo que permite suavizar millones de puntos en milisegundos.
+"""
+from typing import Optional, Union
+
+import numpy as np
+
+DEFAULT_GRID_SIZE = 1024
+# Alcance del nucleo truncado, en anchos de banda; la masa gaussiana fuera de +-5h es despreciable.
+_KERNEL_REACH = 5.0
+
+
+def kde_bandwidth_factor(n: int, bw_method: Union[str, float] = "scott") -> float:
+    """Factor de ancho de banda en una dimension, con la misma convencion que gaussian_kde."""
+    if bw_method == "scott":
+        return float(n ** (-1.0 / 5))
+    if bw_method == "silverman":
+        return float((n * 3.0 / 4.0) ** (-1.0 / 5))
+    if np.isscalar(bw_method) and not isinstance(bw_method, str):
+        return float(bw_method)
+    raise ValueError(f"Metodo de ancho de banda no soportado: {bw_method}")
+
+
+def binned_kde(
+    data: np.ndarray,
+    xs: np.ndarray,
+    bw_method: Union[str, float] = "scott",
+    grid_size: int = DEFAULT_GRID_SIZE,
+    std: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Densidad KDE de data evaluada en xs.
+    Los datos se reparten linealmente entre los dos nodos vecinos de una grilla de grid_size puntos que cubre
+    el rango de los datos mas el alcance del nucleo, se convolucionan con el nucleo gaussiano via FFT y el
+    resultado se interpola en xs. std (ddof=1) puede pasarse si ya se calculo para evitar otra pasada.
+    """
+    data = np.asarray(data, dtype=np.float64).ravel()
+    xs = np.asarray(xs, dtype=np.float64)
+    n = data.size
+    if n < 2:
+        raise ValueError("Se necesitan al menos dos datos para estimar la densidad.")
+    if grid_size < 2:
+        raise ValueError("grid_size debe ser al menos 2.")
+
+    if std is None:
+        std = float(np.std(data, ddof=1))
+    bandwidth = std * kde_bandwidth_factor(n, bw_method)
+    lo, hi = float(data.min()), float(data.max())
+    if bandwidth <= 0 or not np.isfinite(bandwidth):
+        raise ValueError("Los datos no tienen dispersion; la densidad no esta definida.")
+
+    reach = _KERNEL_REACH * bandwidth
+    grid_lo = min(lo, float(xs.min())) - reach
+    grid_hi = max(hi, float(xs.max())) + reach
+    delta = (grid_hi - grid_lo) / (grid_size - 1)
+
+    # Binning lineal: cada dato aporta (1 - w) a su nodo izquierdo y w al derecho.
+    position = (data - grid_lo) / delta
+    left = np.minimum(position.astype(np.int64), grid_size - 2)
+    weight = position - left
+    counts = np.bincount(left, weights=1.0 - weight, minlength=grid_size)
+    counts += np.bincount(left + 1, weights=weight, minlength=grid_size)
+    return _smooth_grid(grid_lo, delta, counts, n, bandwidth, xs)
+
+
+def kde_from_counts(
+    grid_lo: float,
+    delta: float,
+    counts: np.ndarray,
+    std: float,
+    xs: np.ndarray,
+    bw_method: Union[str, float] = "scott",
+) -> np.ndarray:
+    """
+    Densidad KDE a partir de datos ya agrupados: counts[i] es la masa en el nodo grid_lo + i * delta
+    (p. ej. los centros de un histograma fino). std es la desviacion (ddof=1) de los datos originales.
+    El costo no depende de cuantos datos se agruparon.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    xs = np.asarray(xs, dtype=np.float64)
+    n = float(counts.sum())
+    if n < 2:
+        raise ValueError("Se necesitan al menos dos datos para estimar la densidad.")
+    bandwidth = std * kde_bandwidth_factor(n, bw_method)
+    if bandwidth <= 0 or not np.isfinite(bandwidth):
+        raise ValueError("Los datos no tienen dispersion; la densidad no esta definida.")
+
+    # Se agregan nodos vacios a ambos lados para que el nucleo no se recorte en los extremos.
+    pad = int(np.ceil(_KERNEL_REACH * bandwidth / delta))
+    padded = np.concatenate([np.zeros(pad), counts, np.zeros(pad)])
+    return _smooth_grid(grid_lo - pad * delta, delta, padded, n, bandwidth, xs)
+
+
+def _smooth_grid(
+    grid_lo: float, delta: float, counts: np.ndarray, n: float, bandwidth: float, xs: np.ndarray
+) -> np.ndarray:
+    """Convoluciona los conteos de la grilla con el nucleo gaussiano (FFT) e interpola en xs."""
+    grid_size = counts.size
+    half_width = min(grid_size - 1, int(np.ceil(_KERNEL_REACH * bandwidth / delta)))
+    offsets = np.arange(-half_width, half_width + 1) * delta
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (n * bandwidth * np.sqrt(2 * np.pi))
+
+    fft_size = 1 << int(np.ceil(np.log2(grid_size + kernel.size - 1)))
+    smoothed = np.fft.irfft(np.fft.rfft(counts, fft_size) * np.fft.rfft(kernel, fft_size), fft_size)
+    density = np.clip(smoothed[half_width : half_width + grid_size], 0.0, None)
+
+    grid = grid_lo + delta * np.arange(grid_size)
+    return np.interp(xs, grid, density)
@@ -1,25 +1,156 @@
+"""
+Familias de distribuciones poblacionales: generadores, muestreadores directos de la media, parametros
+teoricos y el registro (REGISTRY) que las agrupa. El resto del codigo (simulacion, metricas, interfaz y
+reporte) consulta el registro con get_distribution(nombre) en lugar de ramificar por nombre, asi que una
+familia nueva solo se declara aqui.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 import numpy as np
-from typing import Tuple
+
+from core.rng import make_rng
 
 # Generadores de datos poblacionales
+# Todos reciben un np.random.Generator explicito; con rng=None se crea uno nuevo (no reproducible).
+# Cada generador hace una sola llamada al generador aleatorio, de modo que generar por bloques de filas
+# produce exactamente los mismos valores que una sola llamada (ver core.simulation.iter_sample_mean_chunks).
+# dtype=np.float32 pide datos compactos: las familias continuas generan en float32 cuando numpy lo permite
+# (si no, generan en float64 y convierten) y las discretas devuelven enteros chicos. Con float64 (por defecto)
+# los valores no cambian respecto de las versiones sin dtype. Las que solo convierten al final (native_single=False
+# en el registro) no ahorran memoria de trabajo: la simulacion las genera en float64 tambien en modo "single".
+
+
+def _is_double(dtype) -> bool:
+    return np.dtype(dtype) == np.float64
 
 
-def generate_uniform(a: float, b: float, size: int) -> np.ndarray:
+def generate_uniform(
+    a: float, b: float, size: int, rng: Optional[np.random.Generator] = None, dtype=np.float64
+) -> np.ndarray:
     """Genera datos de una distribucion Uniforme(a, b)."""
-    return np.random.uniform(a, b, size)
+    if _is_double(dtype):
+        return make_rng(rng).uniform(a, b, size)
+    data = make_rng(rng).random(size, dtype=np.float32)
+    data *= b - a
+    data += a
+    return data
 
 
-def generate_exponential(lam: float, size: int) -> np.ndarray:
+def generate_exponential(
+    lam: float, size: int, rng: Optional[np.random.Generator] = None, dtype=np.float64
+) -> np.ndarray:
     """Genera datos de una distribucion Exponencial con tasa lam."""
-    return np.random.exponential(1 / lam, size)
+    if _is_double(dtype):
+        return make_rng(rng).exponential(1 / lam, size)
+    data = make_rng(rng).standard_exponential(size, dtype=np.float32)
+    data /= lam
+    return data
+
+
+def generate_binomial(
+    n_trials: int, p: float, size: int, rng: Optional[np.random.Generator] = None, dtype=np.float64
+) -> np.ndarray:
+    """Genera datos de una distribucion Binomial(n_trials, p); en modo compacto, con el entero mas chico que alcanza."""
+    data = make_rng(rng).binomial(n_trials, p, size)
+    return data if _is_double(dtype) else data.astype(np.min_scalar_type(int(n_trials)))
+
+
+def generate_poisson(mu: float, size: int, rng: Optional[np.random.Generator] = None, dtype=np.float64) -> np.ndarray:
+    """Genera datos de una distribucion Poisson(mu); en modo compacto, como int32."""
+    data = make_rng(rng).poisson(mu, size)
+    return data if _is_double(dtype) else data.astype(np.int32)
+
+
+def generate_lognormal(
+    mu: float, sigma: float, size: int, rng: Optional[np.random.Generator] = None, dtype=np.float64
+) -> np.ndarray:
+    """Genera datos Lognormales: exp(Normal(mu, sigma))."""
+    if _is_double(dtype):
+        return make_rng(rng).lognormal(mu, sigma, size)
+    data = make_rng(rng).standard_normal(size, dtype=np.float32)
+    data *= sigma
+    data += mu
+    return np.exp(data, out=data)
+
+
+def generate_pareto(
+    alpha: float, xm: float, size: int, rng: Optional[np.random.Generator] = None, dtype=np.float64
+) -> np.ndarray:
+    """Genera datos de una Pareto (tipo I) con indice alpha y minimo xm (numpy genera la Lomax, desplazada en 1)."""
+    if _is_double(dtype):
+        return xm * (1.0 + make_rng(rng).pareto(alpha, size))
+    # xm * exp(E / alpha) con E exponencial estandar tiene la misma distribucion y numpy la genera en float32.
+    data = make_rng(rng).standard_exponential(size, dtype=np.float32)
+    data /= alpha
+    np.exp(data, out=data)
+    data *= xm
+    return data
+
+
+def generate_beta(
+    a: float, b: float, size: int, rng: Optional[np.random.Generator] = None, dtype=np.float64
+) -> np.ndarray:
+    """Genera datos de una distribucion Beta(a, b) (numpy no tiene beta en float32: se convierte al final)."""
+    return make_rng(rng).beta(a, b, size).astype(dtype, copy=False)
 
 
-def generate_binomial(n_trials: int, p: float, size: int) -> np.ndarray:
-    """Genera datos de una distribucion Binomial(n_trials, p)."""
-    return np.random.binomial(n_trials, p, size)
+def generate_normal_mixture(
+    w: float, mu1: float, mu2: float, sigma: float, size, rng: Optional[np.random.Generator] = None, dtype=np.float64
+) -> np.ndarray:
+    """
+    Mezcla de dos normales con la misma sigma: con probabilidad w Normal(mu1, sigma), si no Normal(mu2, sigma).
+    Usa una sola uniforme por valor (una sola llamada al generador, para respetar el orden de filas): u < w elige
+    la componente, y dentro de cada componente u reescalada vuelve a ser uniforme e independiente de la eleccion,
+    asi que su cuantil normal (ndtri) da la normal. Todo se hace in situ: la memoria es la del resultado mas una
+    mascara booleana.
+    """
+    from scipy.special import ndtri
+
+    u = make_rng(rng).random(size, dtype=dtype)
+    first = u < w
+    second = ~first
+    np.subtract(u, w, out=u, where=second)
+    np.divide(u, 1.0 - w, out=u, where=second)
+    np.divide(u, w, out=u, where=first)
+    del second
+    # Sin 0 ni 1 (cuantiles infinitos): el recorte es a la mitad del paso de la grilla de uniformes.
+    tiny = np.finfo(u.dtype).eps / 2
+    np.clip(u, tiny, 1.0 - tiny, out=u)
+    z = ndtri(u, out=u)
+    z *= sigma
+    z += mu2
+    np.add(z, mu1 - mu2, out=z, where=first)
+    return z
+
+
+# Muestreadores directos de la media muestral
+# Para algunas familias la distribucion exacta de la media de sample_size observaciones es conocida,
+# asi que se pueden generar las medias sin generar las muestras crudas (costo O(k) en lugar de O(n*k)).
+
+
+def sample_mean_exponential(
+    lam: float, sample_size: int, size, rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """Medias de sample_size Exponenciales(lam): la suma es Gamma(sample_size, 1/lam)."""
+    return make_rng(rng).gamma(sample_size, 1 / (sample_size * lam), size)
+
+
+def sample_mean_binomial(
+    n_trials: int, p: float, sample_size: int, size, rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """Medias de sample_size Binomiales(n_trials, p): la suma es Binomial(sample_size * n_trials, p)."""
+    return make_rng(rng).binomial(sample_size * n_trials, p, size) / sample_size
+
+
+def sample_mean_poisson(mu: float, sample_size: int, size, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Medias de sample_size Poisson(mu): la suma es Poisson(sample_size * mu)."""
+    return make_rng(rng).poisson(sample_size * mu, size) / sample_size
 
 
 # Parametros teoricos
+# Solo usan operaciones de numpy, asi que aceptan escalares o arreglos de parametros (una configuracion por
+# elemento) y calculan todas las configuraciones de un barrido en una llamada.
 
 
 def theoretical_params_uniform(a: float, b: float) -> Tuple[float, float]:
@@ -41,3 +172,393 @@ def theoretical_params_binomial(n_trials: int, p: float) -> Tuple[float, float]:
     mean = n_trials * p
     std = np.sqrt(n_trials * p * (1 - p))
     return mean, std
+
+
+def theoretical_params_poisson(mu: float) -> Tuple[float, float]:
+    """Retorna media y desviacion estandar teoricas para Poisson(mu)."""
+    return mu, np.sqrt(mu)
+
+
+def theoretical_params_lognormal(mu: float, sigma: float) -> Tuple[float, float]:
+    """Retorna media y desviacion estandar teoricas para Lognormal(mu, sigma)."""
+    sigma2 = np.square(sigma)
+    mean = np.exp(mu + sigma2 / 2)
+    std = mean * np.sqrt(np.expm1(sigma2))
+    return mean, std
+
+
+def theoretical_params_pareto(alpha: float, xm: float) -> Tuple[float, float]:
+    """
+    Retorna media y desviacion estandar teoricas para Pareto(alpha, xm).
+    La media es infinita con alpha <= 1 y la varianza con alpha <= 2 (ahi el TCL clasico no aplica).
+    """
+    alpha = np.asarray(alpha, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(alpha > 1, alpha * xm / (alpha - 1), np.inf)
+        variance = np.where(alpha > 2, np.square(xm) * alpha / (np.square(alpha - 1) * (alpha - 2)), np.inf)
+    return mean[()], np.sqrt(variance)[()]
+
+
+def theoretical_params_beta(a: float, b: float) -> Tuple[float, float]:
+    """Retorna media y desviacion estandar teoricas para Beta(a, b)."""
+    total = a + b
+    mean = a / total
+    std = np.sqrt(a * b / (np.square(total) * (total + 1)))
+    return mean, std
+
+
+def theoretical_params_normal_mixture(w: float, mu1: float, mu2: float, sigma: float) -> Tuple[float, float]:
+    """Retorna media y desviacion estandar de la mezcla: varianza = sigma^2 + w (1 - w) (mu1 - mu2)^2."""
+    mean = w * mu1 + (1 - w) * mu2
+    std = np.sqrt(np.square(sigma) + w * (1 - w) * np.square(mu1 - mu2))
+    return mean, std
+
+
+# Funciones cuantil (inversa de la distribucion acumulada)
+# Reciben un arreglo q de probabilidades en (0, 1) y devuelven el valor de la distribucion en cada una.
+# Sirven para tomar muestras estratificadas (ver core.simulation.summarize_population); las discretas
+# devuelven el menor valor cuya probabilidad acumulada alcanza q.
+
+
+def _discrete_ppf(q: np.ndarray, support: np.ndarray, log_pmf: np.ndarray) -> np.ndarray:
+    """Cuantiles de una distribucion discreta con soporte finito (o truncado a una cola despreciable)."""
+    cdf = np.cumsum(np.exp(log_pmf))
+    index = np.searchsorted(cdf, q, side="left")
+    # Por redondeo la ultima acumulada puede quedar apenas por debajo de 1.
+    return support[np.minimum(index, support.size - 1)].astype(np.float64)
+
+
+def ppf_uniform(q: np.ndarray, a: float, b: float) -> np.ndarray:
+    return a + (b - a) * np.asarray(q)
+
+
+def ppf_exponential(q: np.ndarray, lam: float) -> np.ndarray:
+    return -np.log1p(-np.asarray(q)) / lam
+
+
+def ppf_binomial(q: np.ndarray, n_trials: int, p: float) -> np.ndarray:
+    from scipy.special import gammaln
+
+    k = np.arange(n_trials + 1)
+    if p <= 0 or p >= 1:
+        return np.full(np.shape(q), 0.0 if p <= 0 else float(n_trials))
+    log_pmf = (
+        gammaln(n_trials + 1) - gammaln(k + 1) - gammaln(n_trials - k + 1) + k * np.log(p) + (n_trials - k) * np.log1p(-p)
+    )
+    return _discrete_ppf(q, k, log_pmf)
+
+
+def ppf_poisson(q: np.ndarray, mu: float) -> np.ndarray:
+    from scipy.special import gammaln
+
+    k = np.arange(int(mu + 40 * np.sqrt(mu) + 40))
+    return _discrete_ppf(q, k, k * np.log(mu) - mu - gammaln(k + 1))
+
+
+def ppf_lognormal(q: np.ndarray, mu: float, sigma: float) -> np.ndarray:
+    from scipy.special import ndtri
+
+    return np.exp(mu + sigma * ndtri(q))
+
+
+def ppf_pareto(q: np.ndarray, alpha: float, xm: float) -> np.ndarray:
+    # xm * (1 - q)^(-1/alpha), escrito con log1p para no perder precision con q chico.
+    return xm * np.exp(-np.log1p(-np.asarray(q)) / alpha)
+
+
+def ppf_beta(q: np.ndarray, a: float, b: float) -> np.ndarray:
+    from scipy.special import betaincinv
+
+    return betaincinv(a, b, q)
+
+
+def ppf_normal_mixture(q: np.ndarray, w: float, mu1: float, mu2: float, sigma: float) -> np.ndarray:
+    """Sin forma cerrada: se invierte por interpolacion la acumulada evaluada en una grilla fina."""
+    from scipy.special import ndtr
+
+    grid = np.linspace(min(mu1, mu2) - 10 * sigma, max(mu1, mu2) + 10 * sigma, 8193)
+    cdf = w * ndtr((grid - mu1) / sigma) + (1 - w) * ndtr((grid - mu2) / sigma)
+    return np.interp(q, cdf, grid)
+
+
+# Tercer momento absoluto centrado rho = E|X - media|^3 (constante de la cota de Berry-Esseen)
+
+
+def _third_abs_moment_quad(pdf: Callable[[float], float], mean: float, lo: float, hi: float) -> float:
+    """E|X - media|^3 integrando numericamente la densidad a ambos lados de la media."""
+    from scipy.integrate import quad
+
+    def integrand(x: float) -> float:
+        return abs(x - mean) ** 3 * pdf(x)
+
+    left = quad(integrand, lo, mean, limit=200)[0] if lo < mean else 0.0
+    right = quad(integrand, mean, hi, limit=200)[0] if mean < hi else 0.0
+    return float(left + right)
+
+
+def third_abs_moment_uniform(a: float, b: float) -> float:
+    """E|X - media|^3 para Uniforme(a, b): (b - a)^3 / 32."""
+    return (b - a) ** 3 / 32
+
+
+def third_abs_moment_exponential(lam: float) -> float:
+    """E|X - media|^3 para Exponencial(lam): (12 / e - 2) / lam^3."""
+    return (12 / np.e - 2) / lam**3
+
+
+def third_abs_moment_binomial(n_trials: int, p: float) -> float:
+    """E|X - media|^3 para Binomial(n_trials, p), exacto sumando sobre la funcion de probabilidad."""
+    from scipy.special import gammaln
+
+    k = np.arange(n_trials + 1)
+    if p <= 0 or p >= 1:
+        return 0.0
+    log_pmf = (
+        gammaln(n_trials + 1) - gammaln(k + 1) - gammaln(n_trials - k + 1) + k * np.log(p) + (n_trials - k) * np.log1p(-p)
+    )
+    return float(np.sum(np.abs(k - n_trials * p) ** 3 * np.exp(log_pmf)))
+
+
+def third_abs_moment_poisson(mu: float) -> float:
+    """E|X - media|^3 para Poisson(mu), sumando la funcion de probabilidad hasta una cola despreciable."""
+    from scipy.special import gammaln
+
+    k = np.arange(int(mu + 40 * np.sqrt(mu) + 40))
+    log_pmf = k * np.log(mu) - mu - gammaln(k + 1)
+    return float(np.sum(np.abs(k - mu) ** 3 * np.exp(log_pmf)))
+
+
+def third_abs_moment_lognormal(mu: float, sigma: float) -> float:
+    """E|X - media|^3 para Lognormal(mu, sigma), por integracion numerica."""
+    mean, _ = theoretical_params_lognormal(mu, sigma)
+
+    def pdf(x: float) -> float:
+        return np.exp(-((np.log(x) - mu) ** 2) / (2 * sigma**2)) / (x * sigma * np.sqrt(2 * np.pi)) if x > 0 else 0.0
+
+    return _third_abs_moment_quad(pdf, float(mean), 0.0, np.inf)
+
+
+def third_abs_moment_pareto(alpha: float, xm: float) -> float:
+    """E|X - media|^3 para Pareto(alpha, xm); infinito con alpha <= 3."""
+    if alpha <= 3:
+        return float("inf")
+    mean, _ = theoretical_params_pareto(alpha, xm)
+    return _third_abs_moment_quad(lambda x: alpha * xm**alpha / x ** (alpha + 1), float(mean), xm, np.inf)
+
+
+def third_abs_moment_beta(a: float, b: float) -> float:
+    """E|X - media|^3 para Beta(a, b), por integracion numerica."""
+    from scipy.special import betaln
+
+    mean, _ = theoretical_params_beta(a, b)
+    log_norm = betaln(a, b)
+
+    def pdf(x: float) -> float:
+        if x <= 0 or x >= 1:
+            return 0.0
+        return float(np.exp((a - 1) * np.log(x) + (b - 1) * np.log1p(-x) - log_norm))
+
+    return _third_abs_moment_quad(pdf, float(mean), 0.0, 1.0)
+
+
+def third_abs_moment_normal_mixture(w: float, mu1: float, mu2: float, sigma: float) -> float:
+    """E|X - media|^3 para la mezcla de dos normales, por integracion numerica."""
+    mean, _ = theoretical_params_normal_mixture(w, mu1, mu2, sigma)
+
+    def pdf(x: float) -> float:
+        norm = sigma * np.sqrt(2 * np.pi)
+        return w * np.exp(-0.5 * ((x - mu1) / sigma) ** 2) / norm + (1 - w) * np.exp(-0.5 * ((x - mu2) / sigma) ** 2) / norm
+
+    return _third_abs_moment_quad(pdf, float(mean), -np.inf, np.inf)
+
+
+# Registro de distribuciones
+
+
+@dataclass(frozen=True)
+class ParamSpec:
+    """
+    Parametro de una distribucion tal como lo muestra la interfaz (un slider) y lo formatea el reporte.
+    Con greater_than el minimo del slider pasa a ser el valor de ese otro parametro mas un paso.
+    """
+
+    name: str
+    symbol: str
+    label: str
+    min_value: float
+    max_value: float
+    default: float
+    step: float
+    help: str = ""
+    integer: bool = False
+    greater_than: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class DistributionSpec:
+    """
+    Todo lo que el resto del codigo necesita de una familia:
+    - sampler(**params, size, rng, dtype): genera datos poblacionales (dtype=np.float32 en modo compacto);
+    - moments(**params) -> (media, desviacion): vectorizado sobre arreglos de parametros;
+    - third_abs_moment(**params) -> E|X - media|^3 (cota de Berry-Esseen);
+    - mean_sampler(**params, sample_size, size, rng): medias exactas sin muestras crudas, si existe;
+    - ppf(q, **params): funcion cuantil, si existe (muestras estratificadas para graficar poblaciones grandes);
+    - native_single: si el sampler genera en float32 sin pasar por float64/int64. Si es False, el modo compacto
+      solo convierte al final y el bloque de trabajo no se achica, asi que la simulacion usa float64 (ver
+      core.simulation.PRECISIONS).
+    """
+
+    name: str
+    params: Tuple[ParamSpec, ...]
+    sampler: Callable[..., np.ndarray]
+    moments: Callable[..., Tuple[Any, Any]]
+    third_abs_moment: Callable[..., float]
+    mean_sampler: Optional[Callable[..., np.ndarray]] = None
+    ppf: Optional[Callable[..., np.ndarray]] = None
+    native_single: bool = True
+    description: str = ""
+
+    def default_params(self) -> Dict[str, float]:
+        return {param.name: param.default for param in self.params}
+
+    def format_params(self, dist_params: Dict[str, float]) -> str:
+        """Linea legible de parametros, p. ej. "n = 20, p = 0.30"."""
+        parts = []
+        for param in self.params:
+            value = dist_params[param.name]
+            parts.append(f"{param.symbol} = {int(value)}" if param.integer else f"{param.symbol} = {value:.2f}")
+        return ", ".join(parts)
+
+
+REGISTRY: Dict[str, DistributionSpec] = {}
+
+
+def register_distribution(spec: DistributionSpec) -> DistributionSpec:
+    """Agrega (o reemplaza) una familia en el registro; el orden de registro es el orden en la interfaz."""
+    REGISTRY[spec.name] = spec
+    return spec
+
+
+def get_distribution(dist_name: str) -> DistributionSpec:
+    if dist_name not in REGISTRY:
+        raise ValueError(f"Distribucion no soportada: {dist_name}")
+    return REGISTRY[dist_name]
+
+
+def available_distributions() -> List[str]:
+    return list(REGISTRY)
+
+
+register_distribution(
+    DistributionSpec(
+        name="Uniforme",
+        params=(
+            ParamSpec("a", "a", "Limite inferior (a)", -10.0, 10.0, 0.0, 0.5, "Valor minimo de la distribucion."),
+            ParamSpec(
+                "b", "b", "Limite superior (b)", -10.0, 20.0, 5.0, 0.5,
+                "Debe ser mayor que a; controla la amplitud.", greater_than="a",
+            ),
+        ),
+        sampler=generate_uniform,
+        moments=theoretical_params_uniform,
+        third_abs_moment=third_abs_moment_uniform,
+        ppf=ppf_uniform,
+    )
+)
+register_distribution(
+    DistributionSpec(
+        name="Exponencial",
+        params=(ParamSpec("lam", "lambda", "Tasa (lambda)", 0.1, 5.0, 1.0, 0.1, "Mayor lambda implica colas mas cortas."),),
+        sampler=generate_exponential,
+        moments=theoretical_params_exponential,
+        third_abs_moment=third_abs_moment_exponential,
+        ppf=ppf_exponential,
+        mean_sampler=sample_mean_exponential,
+    )
+)
+register_distribution(
+    DistributionSpec(
+        name="Binomial",
+        params=(
+            ParamSpec("n_trials", "n", "Numero de ensayos (n)", 1, 60, 20, 1, "Cantidad de ensayos por prueba.", integer=True),
+            ParamSpec("p", "p", "Probabilidad de exito (p)", 0.01, 0.99, 0.5, 0.01, "Probabilidad en cada ensayo."),
+        ),
+        sampler=generate_binomial,
+        moments=theoretical_params_binomial,
+        third_abs_moment=third_abs_moment_binomial,
+        ppf=ppf_binomial,
+        native_single=False,
+        mean_sampler=sample_mean_binomial,
+    )
+)
+register_distribution(
+    DistributionSpec(
+        name="Poisson",
+        params=(ParamSpec("mu", "mu", "Tasa media (mu)", 0.1, 20.0, 3.0, 0.1, "Promedio de eventos; con mu chico es muy asimetrica."),),
+        sampler=generate_poisson,
+        moments=theoretical_params_poisson,
+        third_abs_moment=third_abs_moment_poisson,
+        ppf=ppf_poisson,
+        native_single=False,
+        mean_sampler=sample_mean_poisson,
+    )
+)
+register_distribution(
+    DistributionSpec(
+        name="Lognormal",
+        params=(
+            ParamSpec("mu", "mu", "Media del logaritmo (mu)", -1.0, 2.0, 0.0, 0.1, "Desplaza la escala de la distribucion."),
+            ParamSpec("sigma", "sigma", "Desviacion del logaritmo (sigma)", 0.1, 1.5, 0.75, 0.05, "Mayor sigma implica cola derecha mas pesada."),
+        ),
+        sampler=generate_lognormal,
+        moments=theoretical_params_lognormal,
+        third_abs_moment=third_abs_moment_lognormal,
+        ppf=ppf_lognormal,
+    )
+)
+register_distribution(
+    DistributionSpec(
+        name="Pareto",
+        params=(
+            ParamSpec(
+                "alpha", "alpha", "Indice de cola (alpha)", 2.1, 8.0, 3.0, 0.1,
+                "Cola pesada: con alpha <= 3 el tercer momento es infinito y la convergencia al TCL es lenta.",
+            ),
+            ParamSpec("xm", "x_m", "Valor minimo (x_m)", 0.5, 5.0, 1.0, 0.5, "Escala: ningun valor es menor que x_m."),
+        ),
+        sampler=generate_pareto,
+        moments=theoretical_params_pareto,
+        third_abs_moment=third_abs_moment_pareto,
+        ppf=ppf_pareto,
+    )
+)
+register_distribution(
+    DistributionSpec(
+        name="Beta",
+        params=(
+            ParamSpec("a", "a", "Forma (a)", 0.1, 10.0, 0.5, 0.1, "Con a y b menores que 1 la densidad tiene forma de U."),
+            ParamSpec("b", "b", "Forma (b)", 0.1, 10.0, 0.5, 0.1, "Con a distinto de b la distribucion es asimetrica."),
+        ),
+        sampler=generate_beta,
+        moments=theoretical_params_beta,
+        third_abs_moment=third_abs_moment_beta,
+        ppf=ppf_beta,
+        native_single=False,
+    )
+)
+register_distribution(
+    DistributionSpec(
+        name="Mezcla normal",
+        params=(
+            ParamSpec("w", "w", "Peso de la primera componente (w)", 0.05, 0.95, 0.3, 0.05, "Probabilidad de la primera normal."),
+            ParamSpec("mu1", "mu1", "Media de la primera componente", -5.0, 5.0, -2.0, 0.5, "Centro del primer pico."),
+            ParamSpec("mu2", "mu2", "Media de la segunda componente", -5.0, 5.0, 3.0, 0.5, "Centro del segundo pico."),
+            ParamSpec("sigma", "sigma", "Desviacion de cada componente", 0.2, 3.0, 1.0, 0.1, "Picos separados dan una poblacion bimodal."),
+        ),
+        sampler=generate_normal_mixture,
+        moments=theoretical_params_normal_mixture,
+        third_abs_moment=third_abs_moment_normal_mixture,
+        ppf=ppf_normal_mixture,
+        description="Mezcla de dos normales con la misma desviacion.",
+    )
+)
@@ -0,0 +1,176 @@
+"""
+Histogramas precalculados para graficar sin pasar arreglos crudos a matplotlib.
+Un HistogramAccumulator tiene bordes fijos, se actualiza bloque a bloque y se combina entre trabajadores.
+DistributionSummary junta en una sola pasada un histograma fino (del que salen el histograma a mostrar
+y la KDE) con los momentos empiricos, de modo que graficar cuesta lo mismo sin importar el tamano de los datos.
+"""
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from core.density import kde_from_counts
+from core.metrics import QuantileSketch, RunningMoments
+
+# Bins del histograma fino por defecto; se redondea a un multiplo de los bins mostrados para poder reagrupar.
+DEFAULT_FINE_BINS = 1024
+# Valores por bloque al resumir un arreglo completo: acota los temporales (indices, mascaras) con k muy grande.
+SUMMARY_BLOCK_SIZE = 1 << 22
+# Percentiles que acompanan a los momentos en DistributionSummary.stats().
+SUMMARY_PERCENTILES = {"p025": 0.025, "p05": 0.05, "median": 0.5, "p95": 0.95, "p975": 0.975}
+# Tamano del sketch de cuantiles del resumen: ~8 KB y error de rango del orden de 0.1-0.2%.
+SUMMARY_SKETCH_K = 1024
+
+
+class HistogramAccumulator:
+    """
+    Conteos en bins de igual ancho sobre [lo, hi]. Los valores fuera del rango se cuentan aparte
+    (underflow / overflow) para no sesgar los bins; el ultimo bin incluye hi, como np.histogram.
+    """
+
+    def __init__(self, lo: float, hi: float, bins: int) -> None:
+        if bins <= 0:
+            raise ValueError("bins debe ser positivo.")
+        if not hi > lo:
+            # Datos constantes: se abre un rango unitario alrededor del valor, como hace np.histogram.
+            lo, hi = lo - 0.5, hi + 0.5
+        self.lo = float(lo)
+        self.hi = float(hi)
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    @property
+    def width(self) -> float:
+        return (self.hi - self.lo) / self.bins
+
+    @property
+    def edges(self) -> np.ndarray:
+        return np.linspace(self.lo, self.hi, self.bins + 1)
+
+    @property
+    def centers(self) -> np.ndarray:
+        return self.lo + self.width * (np.arange(self.bins) + 0.5)
+
+    @property
+    def total(self) -> int:
+        """Cantidad de valores dentro del rango."""
+        return int(self.counts.sum())
+
+    def update(self, chunk: np.ndarray) -> "HistogramAccumulator":
+        chunk = np.asarray(chunk, dtype=np.float64).ravel()
+        below = chunk < self.lo
+        above = chunk > self.hi
+        n_below, n_above = int(below.sum()), int(above.sum())
+        self.underflow += n_below
+        self.overflow += n_above
+        inside = chunk[~(below | above)] if (n_below or n_above) else chunk
+        index = ((inside - self.lo) / self.width).astype(np.int64)
+        np.minimum(index, self.bins - 1, out=index)
+        self.counts += np.bincount(index, minlength=self.bins)
+        return self
+
+    def merge(self, other: "HistogramAccumulator") -> "HistogramAccumulator":
+        if (self.lo, self.hi, self.bins) != (other.lo, other.hi, other.bins):
+            raise ValueError("Solo se pueden combinar histogramas con los mismos bordes.")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def density(self) -> np.ndarray:
+        """Alturas normalizadas para que el area sea 1 (equivalente a density=True en ax.hist)."""
+        total = self.total
+        if total == 0:
+            return np.zeros(self.bins)
+        return self.counts / (total * self.width)
+
+    def rebin(self, factor: int) -> "HistogramAccumulator":
+        """Agrupa cada `factor` bins consecutivos en uno (bins debe ser multiplo de factor)."""
+        if factor <= 0 or self.bins % factor:
+            raise ValueError("bins debe ser multiplo de factor.")
+        coarse = HistogramAccumulator(self.lo, self.hi, self.bins // factor)
+        coarse.counts = self.counts.reshape(-1, factor).sum(axis=1)
+        coarse.underflow, coarse.overflow = self.underflow, self.overflow
+        return coarse
+
+
+def compute_histogram(
+    data: np.ndarray, bins: int, lo: Optional[float] = None, hi: Optional[float] = None
+) -> HistogramAccumulator:
+    """Histograma de un arreglo; sin rango explicito usa [min, max] de los datos."""
+    data = np.asarray(data)
+    if lo is None or hi is None:
+        lo = float(data.min()) if lo is None else lo
+        hi = float(data.max()) if hi is None else hi
+    return HistogramAccumulator(lo, hi, bins).update(data)
+
+
+class DistributionSummary:
+    """
+    Todo lo que necesitan las graficas de un conjunto de datos: histograma fino, momentos, cuantiles y rango.
+    display_bins es la cantidad de bins a mostrar; el histograma fino usa un multiplo de ese valor.
+    Los cuantiles salen de un QuantileSketch (semilla fija, asi el resumen de los mismos datos es reproducible).
+    """
+
+    def __init__(self, lo: float, hi: float, display_bins: int, fine_bins: int = DEFAULT_FINE_BINS) -> None:
+        factor = max(1, -(-fine_bins // display_bins))
+        self.display_bins = display_bins
+        self.fine = HistogramAccumulator(lo, hi, display_bins * factor)
+        self.moments = RunningMoments()
+        self.sketch = QuantileSketch(SUMMARY_SKETCH_K, seed=0)
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def update(self, chunk: np.ndarray) -> "DistributionSummary":
+        chunk = np.asarray(chunk)
+        if chunk.size == 0:
+            return self
+        self.fine.update(chunk)
+        self.moments.update(chunk)
+        self.sketch.update(chunk)
+        self.min = min(self.min, float(chunk.min()))
+        self.max = max(self.max, float(chunk.max()))
+        return self
+
+    def merge(self, other: "DistributionSummary") -> "DistributionSummary":
+        self.fine.merge(other.fine)
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def histogram(self) -> HistogramAccumulator:
+        """Histograma con display_bins bins, reagrupado desde el fino."""
+        return self.fine.rebin(self.fine.bins // self.display_bins)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.fine.counts.nbytes) + self.sketch.nbytes
+
+    def stats(self) -> Dict[str, float]:
+        """Momentos (como RunningMoments.to_dict) mas los percentiles de SUMMARY_PERCENTILES."""
+        stats = self.moments.to_dict()
+        values = self.sketch.quantiles(list(SUMMARY_PERCENTILES.values()))
+        stats.update({name: float(value) for name, value in zip(SUMMARY_PERCENTILES, values)})
+        return stats
+
+    def kde(self, xs: np.ndarray, bw_method: Union[str, float] = "scott") -> np.ndarray:
+        """KDE evaluada en xs a partir del histograma fino (ver core.density.kde_from_counts)."""
+        n = self.moments.count
+        std = float(np.sqrt(self.moments.m2 / (n - 1))) if n > 1 else 0.0
+        fine = self.fine
+        return kde_from_counts(fine.lo + fine.width / 2, fine.width, fine.counts, std, xs, bw_method)
+
+
+def summarize_array(
+    data: np.ndarray, display_bins: int, fine_bins: int = DEFAULT_FINE_BINS
+) -> DistributionSummary:
+    """Resumen de un arreglo completo sobre su rango [min, max], recorrido por bloques (sirve con memmap)."""
+    data = np.asarray(data).ravel()
+    summary = DistributionSummary(float(data.min()), float(data.max()), display_bins, fine_bins)
+    for start in range(0, data.size, SUMMARY_BLOCK_SIZE):
+        summary.update(data[start : start + SUMMARY_BLOCK_SIZE])
+    return summary
@@ -1,35 +1,397 @@
-from typing import Dict, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 
-from core.distributions import (
-    theoretical_params_binomial,
-    theoretical_params_exponential,
-    theoretical_params_uniform,
-)
+from core.distributions import get_distribution
 
+# Constante de la cota de Berry-Esseen para variables iid (Shevtsova, 2011).
+BERRY_ESSEEN_C = 0.4748
+# Valores criticos al 5% con la normal totalmente especificada: KS asintotico (multiplica 1/sqrt(k))
+# y Anderson-Darling (caso 0, parametros conocidos).
+KS_CRITICAL_5 = 1.358
+AD_CRITICAL_5 = 2.492
 
-def compute_empirical_stats(data: np.ndarray) -> Dict[str, float]:
-    """Calcula media y desviacion estandar empiricas."""
+
+def compute_empirical_stats(data: Union[np.ndarray, Iterable[np.ndarray]]) -> Dict[str, float]:
+    """
+    Calcula media y desviacion estandar empiricas.
+    Ademas de un arreglo acepta un iterable de bloques (p. ej. core.simulation.iter_population_chunks), que se
+    recorre una sola vez en streaming sin materializar los datos.
+    """
+    if not isinstance(data, np.ndarray):
+        moments = RunningMoments()
+        for chunk in data:
+            moments.update(chunk)
+            # Sin esta referencia el bloque se libera antes de generar el siguiente.
+            del chunk
+        return {"mean": float(moments.mean), "std": moments.std, "size": moments.count}
     mean = float(np.mean(data))
     std = float(np.std(data, ddof=0))
     return {"mean": mean, "std": std, "size": len(data)}
 
 
+class RunningMoments:
+    """
+    Acumulador en una sola pasada de conteo, media y momentos centrales M2, M3 y M4.
+    Consume bloques (update) y combina acumuladores parciales de otros trabajadores (merge) con las
+    formulas de Chan/Pebay, sin guardar los datos. Asimetria y curtosis coinciden con scipy.stats.skew
+    y scipy.stats.kurtosis (sesgadas, curtosis en exceso).
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+
+    @classmethod
+    def from_array(cls, data: np.ndarray) -> "RunningMoments":
+        moments = cls()
+        moments.update(data)
+        return moments
+
+    def update(self, chunk: np.ndarray) -> "RunningMoments":
+        """Incorpora un bloque de datos (se aplana si tiene mas de una dimension)."""
+        chunk = np.asarray(chunk)
+        # Los bloques float32 (modo "single") no se copian a float64: la media y los desvios se calculan en
+        # float64 directamente desde el bloque compacto.
+        chunk = (chunk if chunk.dtype == np.float32 else chunk.astype(np.float64, copy=False)).ravel()
+        if chunk.size == 0:
+            return self
+        other = RunningMoments()
+        other.count = chunk.size
+        other.mean = float(chunk.mean(dtype=np.float64))
+        # Potencias calculadas in situ: dos temporales del tamano del bloque en lugar de cuatro.
+        deviations = np.subtract(chunk, other.mean, dtype=np.float64)
+        squared = deviations * deviations
+        other.m2 = float(squared.sum())
+        other.m3 = float(np.multiply(deviations, squared, out=deviations).sum())
+        other.m4 = float(np.multiply(squared, squared, out=squared).sum())
+        return self.merge(other)
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """Combina otro acumulador en este (in situ) y lo devuelve."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean = other.count, other.mean
+            self.m2, self.m3, self.m4 = other.m2, other.m3, other.m4
+            return self
+
+        n_a, n_b = self.count, other.count
+        n = n_a + n_b
+        delta = other.mean - self.mean
+        delta_n = delta / n
+        m2 = self.m2 + other.m2 + delta * delta_n * n_a * n_b
+        m3 = (
+            self.m3
+            + other.m3
+            + delta * delta_n * delta_n * n_a * n_b * (n_a - n_b)
+            + 3 * delta_n * (n_a * other.m2 - n_b * self.m2)
+        )
+        m4 = (
+            self.m4
+            + other.m4
+            + delta * delta_n**3 * n_a * n_b * (n_a * n_a - n_a * n_b + n_b * n_b)
+            + 6 * delta_n * delta_n * (n_a * n_a * other.m2 + n_b * n_b * self.m2)
+            + 4 * delta_n * (n_a * other.m3 - n_b * self.m3)
+        )
+        self.count = n
+        self.mean = self.mean + delta_n * n_b
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Varianza poblacional (ddof=0), como np.var."""
+        return self.m2 / self.count if self.count else float("nan")
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    @property
+    def skewness(self) -> float:
+        if self.count == 0 or self.m2 == 0:
+            return float("nan")
+        return float(np.sqrt(self.count) * self.m3 / self.m2**1.5)
+
+    @property
+    def kurtosis(self) -> float:
+        """Curtosis en exceso (0 para la normal)."""
+        if self.count == 0 or self.m2 == 0:
+            return float("nan")
+        return float(self.count * self.m4 / (self.m2 * self.m2) - 3.0)
+
+    def to_dict(self) -> Dict[str, float]:
+        """Mismas claves que compute_empirical_stats mas asimetria y curtosis."""
+        return {
+            "mean": float(self.mean),
+            "std": self.std,
+            "size": self.count,
+            "skewness": self.skewness,
+            "kurtosis": self.kurtosis,
+        }
+
+
+class QuantileSketch:
+    """
+    Sketch de cuantiles tipo KLL: resume un flujo de valores en memoria acotada y se combina entre trabajadores.
+    Los valores se guardan en niveles; un item del nivel h representa 2^h valores. Cuando un nivel supera
+    su capacidad se ordena y se promueve la mitad de sus items (pares o impares al azar) al nivel siguiente.
+    La capacidad del nivel mas alto es k y decrece por un factor 2/3 hacia abajo (minimo 2), asi que la memoria
+    es O(k) items sin importar cuantos valores se vean.
+    Error: el rango de cada cuantil se equivoca en el orden de 1/k, sin importar la cantidad de datos
+    (medido con 10^6 valores: peor cuantil de 99 con ~1.2% con k=200 y ~0.5% con k=400).
+    El minimo y el maximo son exactos.
+    Con la misma semilla y la misma secuencia de update/merge el resultado es reproducible.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None) -> None:
+        if k < 8:
+            raise ValueError("k debe ser al menos 8.")
+        self.k = k
+        self.count = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self._levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(level.nbytes for level in self._levels))
+
+    def update(self, chunk: np.ndarray) -> "QuantileSketch":
+        """Incorpora un bloque de valores (se aplana si tiene mas de una dimension)."""
+        chunk = np.asarray(chunk, dtype=np.float64).ravel()
+        if chunk.size == 0:
+            return self
+        self.count += chunk.size
+        self.min = min(self.min, float(chunk.min()))
+        self.max = max(self.max, float(chunk.max()))
+        self._levels[0] = np.concatenate((self._levels[0], chunk))
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Combina otro sketch en este (in situ) y lo devuelve."""
+        if other.count == 0:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate((self._levels[level], items))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if items.size > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # Si la cantidad es impar, el ultimo item queda en este nivel y se promueven los demas.
+                keep = items[items.size - items.size % 2 :]
+                offset = int(self._rng.integers(2))
+                promoted = items[offset : items.size - items.size % 2 : 2]
+                self._levels[level] = keep
+                self._levels[level + 1] = np.concatenate((self._levels[level + 1], promoted))
+            level += 1
+
+    def _weighted(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Items ordenados y su peso acumulado."""
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(items.size, 2.0**level) for level, items in enumerate(self._levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs) -> np.ndarray:
+        """Cuantiles aproximados para las probabilidades qs (q=0 y q=1 devuelven el minimo y el maximo exactos)."""
+        qs = np.asarray(qs, dtype=np.float64)
+        if np.any((qs < 0) | (qs > 1)):
+            raise ValueError("Las probabilidades deben estar en [0, 1].")
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+        values, cumulative = self._weighted()
+        index = np.searchsorted(cumulative, qs * cumulative[-1], side="left")
+        result = values[np.minimum(index, values.size - 1)]
+        result = np.where(qs <= 0, self.min, result)
+        return np.where(qs >= 1, self.max, result)
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    def rank(self, x: float) -> float:
+        """Fraccion aproximada de los valores que son <= x."""
+        if self.count == 0:
+            return float("nan")
+        values, cumulative = self._weighted()
+        index = np.searchsorted(values, x, side="right")
+        return float(cumulative[index - 1] / cumulative[-1]) if index else 0.0
+
+
+def compute_streaming_stats(chunks: Iterable[np.ndarray]) -> Dict[str, float]:
+    """
+    Metricas empiricas en una sola pasada sobre bloques (p. ej. iter_sample_mean_chunks),
+    sin materializar el arreglo completo.
+    """
+    moments = RunningMoments()
+    for chunk in chunks:
+        moments.update(chunk)
+    return moments.to_dict()
+
+
+def normal_cdf(x: np.ndarray, mean: float, std: float) -> np.ndarray:
+    """Funcion de distribucion de la normal (scipy.special.ndtr se carga solo al usarla)."""
+    from scipy.special import ndtr
+
+    return ndtr((np.asarray(x, dtype=np.float64) - mean) / std)
+
+
+def ks_distance_normal(data: np.ndarray, mean: float, std: float) -> float:
+    """
+    Estadistico de Kolmogorov-Smirnov entre la distribucion empirica de data y la normal(mean, std):
+    la mayor distancia vertical entre ambas funciones de distribucion.
+    """
+    values = np.sort(np.asarray(data, dtype=np.float64).ravel())
+    if values.size == 0:
+        return float("nan")
+    cdf = normal_cdf(values, mean, std)
+    steps = np.arange(1, values.size + 1) / values.size
+    return float(max((steps - cdf).max(), (cdf - (steps - 1.0 / values.size)).max()))
+
+
+def ks_bounds_from_counts(
+    edges: np.ndarray, counts: np.ndarray, mean: float, std: float, underflow: int = 0, overflow: int = 0
+) -> Tuple[float, float]:
+    """
+    Cotas del estadistico KS contra normal(mean, std) conociendo solo un histograma.
+    La distribucion empirica es exacta en los bordes, asi que la distancia en los bordes es una cota inferior;
+    dentro de cada bin ambas funciones son crecientes, lo que da la cota superior. Con bins finos ambas
+    coinciden hasta el orden de la masa normal de un bin. Los valores fuera de rango cuentan en los extremos.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum() + underflow + overflow
+    if total == 0:
+        return float("nan"), float("nan")
+    ecdf = (underflow + np.concatenate(([0.0], np.cumsum(counts)))) / total
+    cdf = normal_cdf(edges, mean, std)
+    lower = float(np.abs(ecdf - cdf).max())
+    upper = max(lower, float((ecdf[1:] - cdf[:-1]).max()), float((cdf[1:] - ecdf[:-1]).max()))
+    if underflow:
+        upper = max(upper, float(underflow / total))
+    if overflow:
+        upper = max(upper, float(overflow / total))
+    return lower, upper
+
+
+def _xlogy(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """x * log(y) con 0 * log(0) = 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(x == 0, 0.0, x * np.log(y))
+
+
+def anderson_darling_from_counts(points: np.ndarray, counts: np.ndarray, mean: float, std: float) -> float:
+    """
+    Estadistico de Anderson-Darling contra normal(mean, std) para datos agrupados: counts[i] valores en points[i]
+    (points crecientes). Integra en forma cerrada sobre cada tramo donde la distribucion empirica es constante,
+    asi que con un conteo por valor coincide con la formula clasica; con bins, cada bin cuenta en su centro.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum()
+    if total == 0:
+        return float("nan")
+    tiny = np.finfo(np.float64).eps
+    u = np.clip(normal_cdf(points, mean, std), tiny, 1 - tiny)
+    lo = np.concatenate(([0.0], u))
+    hi = np.concatenate((u, [1.0]))
+    a = np.concatenate(([0.0], np.cumsum(counts) / total))
+    a[-1] = 1.0
+    b = 1.0 - a
+    # Primitiva de (a - u)^2 / (u (1 - u)): a^2 ln u - (1 - a)^2 ln(1 - u) - u
+    integral = (
+        _xlogy(a * a, hi) - _xlogy(a * a, lo) - _xlogy(b * b, 1.0 - hi) + _xlogy(b * b, 1.0 - lo) - (hi - lo)
+    )
+    return float(total * integral.sum())
+
+
+def anderson_darling_normal(data: np.ndarray, mean: float, std: float) -> float:
+    """Anderson-Darling exacto de un arreglo contra normal(mean, std)."""
+    values, counts = np.unique(np.asarray(data, dtype=np.float64).ravel(), return_counts=True)
+    return anderson_darling_from_counts(values, counts, mean, std)
+
+
+def berry_esseen_bound(dist_name: str, dist_params: Dict[str, float], sample_size: int) -> float:
+    """
+    Cota de Berry-Esseen: la distancia KS entre la distribucion exacta de la media de n observaciones
+    y la normal del TCL es a lo sumo C * rho / (sigma^3 * sqrt(n)), con rho = E|X - media|^3.
+    """
+    _, sigma = _theoretical_population_params(dist_name, dist_params)
+    if sigma <= 0:
+        return float("nan")
+    rho = get_distribution(dist_name).third_abs_moment(**dist_params)
+    return float(min(1.0, BERRY_ESSEEN_C * rho / (sigma**3 * np.sqrt(sample_size))))
+
+
+def compute_normality_diagnostics(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    sample_size: int,
+    moments: RunningMoments,
+    edges: np.ndarray,
+    counts: np.ndarray,
+    underflow: int = 0,
+    overflow: int = 0,
+    theoretical: Optional[Dict[str, float]] = None,
+) -> Dict[str, float]:
+    """
+    Diagnosticos de normalidad de las medias muestrales frente a normal(media teorica, error estandar),
+    a partir de un histograma fino y momentos acumulados: no requiere ordenar ni guardar las k medias.
+    Claves: ks y ks_upper (cotas del estadistico KS), ks_critical (umbral al 5% para este k),
+    anderson_darling (datos agrupados por bin), skewness, kurtosis y berry_esseen (cota teorica de KS).
+    theoretical (de compute_theoretical_stats) evita recalcular los valores teoricos si ya se tienen.
+    """
+    if theoretical is None:
+        theoretical = compute_theoretical_stats(dist_name, dist_params, sample_size)
+    mean, se = theoretical["mean"], theoretical["se"]
+    total = moments.count
+    edges = np.asarray(edges, dtype=np.float64)
+    ks, ks_upper = ks_bounds_from_counts(edges, counts, mean, se, underflow, overflow)
+    points = np.concatenate(([edges[0]], (edges[:-1] + edges[1:]) / 2, [edges[-1]]))
+    grouped = np.concatenate(([underflow], np.asarray(counts, dtype=np.float64), [overflow]))
+    return {
+        "ks": ks,
+        "ks_upper": ks_upper,
+        "ks_critical": float(KS_CRITICAL_5 / np.sqrt(total)) if total else float("nan"),
+        "anderson_darling": anderson_darling_from_counts(points, grouped, mean, se),
+        "skewness": moments.skewness,
+        "kurtosis": moments.kurtosis,
+        "berry_esseen": berry_esseen_bound(dist_name, dist_params, sample_size),
+    }
+
+
 def _theoretical_population_params(dist_name: str, dist_params: Dict[str, float]) -> Tuple[float, float]:
-    if dist_name == "Uniforme":
-        return theoretical_params_uniform(dist_params["a"], dist_params["b"])
-    if dist_name == "Exponencial":
-        return theoretical_params_exponential(dist_params["lam"])
-    if dist_name == "Binomial":
-        return theoretical_params_binomial(dist_params["n_trials"], dist_params["p"])
-    raise ValueError(f"Distribucion no soportada: {dist_name}")
+    return get_distribution(dist_name).moments(**dist_params)
 
 
 def compute_theoretical_stats(
     dist_name: str, dist_params: Dict[str, float], sample_size: int
 ) -> Dict[str, float]:
-    """Calcula parametros teoricos de la poblacion y el error estandar de la media."""
+    """
+    Calcula parametros teoricos de la poblacion y el error estandar de la media.
+    Los parametros y sample_size pueden ser arreglos (una configuracion por elemento): los momentos estan
+    vectorizados, asi que un barrido completo se resuelve en una sola llamada y se obtienen arreglos.
+    """
     pop_mean, pop_std = _theoretical_population_params(dist_name, dist_params)
     se_mean = pop_std / np.sqrt(sample_size)
     return {"mean": pop_mean, "std": pop_std, "se": se_mean}
@@ -0,0 +1,170 @@
+"""
+Instrumentacion ligera por etapas: duracion, memoria asignada y aciertos/fallos de cache.
+El codigo instrumentado usa profile_stage("nombre") y record_cache(...); solo se mide algo cuando hay un
+Profiler activo en el contexto actual (use_profiler). Sin profiler activo, profile_stage devuelve un
+contexto nulo compartido y el costo es una lectura de ContextVar.
+La memoria se mide con tracemalloc (numpy le reporta sus asignaciones); como tracemalloc es global al proceso,
+con varias sesiones concurrentes los bytes de una etapa pueden incluir asignaciones de otros hilos, y el rastreo
+se inicia con el primer profiler que lo necesita y se detiene solo cuando cierra el ultimo (conteo de referencias).
+"""
+import contextlib
+import contextvars
+import json
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, List, Optional
+
+_active: "contextvars.ContextVar[Optional[Profiler]]" = contextvars.ContextVar("tcl_profiler", default=None)
+_NULL_CONTEXT = contextlib.nullcontext()
+
+# Profilers que usan tracemalloc en este momento. tracemalloc.stop() es global al proceso: si un profiler lo
+# detuviera mientras otra sesion esta dentro de una etapa, esa etapa registraria bytes sin sentido (o negativos).
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_started = False
+
+
+def _acquire_tracemalloc() -> None:
+    """Registra un usuario de tracemalloc y lo inicia si nadie lo habia iniciado."""
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        _tracemalloc_users += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_started = True
+
+
+def _release_tracemalloc() -> None:
+    """Quita un usuario; el ultimo detiene tracemalloc, salvo que lo haya iniciado otro codigo (p. ej. un test)."""
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_started:
+            tracemalloc.stop()
+            _tracemalloc_started = False
+
+
+class Profiler:
+    """
+    Registra una fila por etapa: nombre, segundos, bytes asignados netos, pico sobre el inicio y estado de cache.
+    Con keep_records=False solo se conservan los totales por etapa (util en barridos largos).
+    """
+
+    def __init__(self, track_memory: bool = True, keep_records: bool = True) -> None:
+        self.track_memory = track_memory
+        self.keep_records = keep_records
+        self.records: List[Dict[str, Any]] = []
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self._stack: List[Dict[str, int]] = []
+        self._uses_tracemalloc = False
+
+    @contextlib.contextmanager
+    def stage(self, name: str, cache: Optional[str] = None) -> Iterator[None]:
+        memory = self.track_memory
+        if memory:
+            if not self._uses_tracemalloc:
+                _acquire_tracemalloc()
+                self._uses_tracemalloc = True
+            current, peak = tracemalloc.get_traced_memory()
+            # El pico de tracemalloc es uno solo: antes de reiniciarlo se traslada a la etapa que lo contiene.
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            frame = {"start": current, "peak": current}
+            self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            alloc_bytes = peak_bytes = None
+            if memory:
+                current, peak = tracemalloc.get_traced_memory()
+                self._stack.pop()
+                absolute_peak = max(frame["peak"], peak)
+                alloc_bytes = current - frame["start"]
+                peak_bytes = absolute_peak - frame["start"]
+                if self._stack:
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], absolute_peak)
+            self._add(
+                {
+                    "stage": name,
+                    "seconds": seconds,
+                    "alloc_bytes": alloc_bytes,
+                    "peak_bytes": peak_bytes,
+                    "cache": cache,
+                }
+            )
+
+    def record_cache(self, name: str, hit: bool) -> None:
+        """Registra un acierto de cache (la etapa no se ejecuto) o un fallo sin medicion asociada."""
+        cache = "hit" if hit else "miss"
+        self._add({"stage": name, "seconds": 0.0, "alloc_bytes": 0, "peak_bytes": 0, "cache": cache})
+
+    def _add(self, record: Dict[str, Any]) -> None:
+        if self.keep_records:
+            self.records.append(record)
+        total = self._total(record["stage"])
+        total["calls"] += 1
+        total["seconds"] += record["seconds"]
+        total["max_peak_bytes"] = max(total["max_peak_bytes"], record["peak_bytes"] or 0)
+        if record["cache"] == "hit":
+            total["hits"] += 1
+        elif record["cache"] == "miss":
+            total["misses"] += 1
+
+    def _total(self, stage: str) -> Dict[str, float]:
+        return self.totals.setdefault(stage, {"calls": 0, "seconds": 0.0, "max_peak_bytes": 0, "hits": 0, "misses": 0})
+
+    def merge(self, other: "Profiler") -> "Profiler":
+        """Incorpora registros y totales de otro profiler (p. ej. de un trabajador)."""
+        if self.keep_records:
+            self.records.extend(other.records)
+        for stage, other_total in other.totals.items():
+            total = self._total(stage)
+            for field in ("calls", "seconds", "hits", "misses"):
+                total[field] += other_total[field]
+            total["max_peak_bytes"] = max(total["max_peak_bytes"], other_total["max_peak_bytes"])
+        return self
+
+    def close(self) -> None:
+        """Libera tracemalloc: se detiene cuando cierra el ultimo profiler que lo usaba."""
+        if self._uses_tracemalloc:
+            self._uses_tracemalloc = False
+            _release_tracemalloc()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"records": self.records, "totals": self.totals}
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """Serializa registros y totales; si se da path tambien los escribe en el archivo."""
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(text)
+        return text
+
+
+@contextlib.contextmanager
+def use_profiler(profiler: Optional[Profiler]) -> Iterator[Optional[Profiler]]:
+    """Activa el profiler en el contexto actual (None lo desactiva) durante el bloque."""
+    token = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
+
+
+def profile_stage(name: str, cache: Optional[str] = None):
+    """Contexto que mide la etapa si hay un profiler activo; si no, no hace nada."""
+    profiler = _active.get()
+    if profiler is None:
+        return _NULL_CONTEXT
+    return profiler.stage(name, cache)
+
+
+def record_cache(name: str, hit: bool) -> None:
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.record_cache(name, hit)
@@ -0,0 +1,59 @@
+"""
+Generadores aleatorios reproducibles basados en np.random.Generator.
+Centralizar aqui la creacion de generadores permite fijar semillas, elegir el bit generator
+y derivar flujos independientes (SeedSequence.spawn) para entregar a trabajadores en paralelo.
+"""
+from typing import List, Union
+
+import numpy as np
+
+SeedLike = Union[None, int, np.random.SeedSequence, np.random.Generator]
+
+_BIT_GENERATORS = {
+    "PCG64": np.random.PCG64,
+    "Philox": np.random.Philox,
+}
+
+
+def make_rng(seed: SeedLike = None, bit_generator: str = "PCG64") -> np.random.Generator:
+    """
+    Crea un np.random.Generator a partir de una semilla entera, una SeedSequence o None (entropia del SO).
+    Si ya se recibe un Generator se devuelve tal cual, para poder encadenar llamadas que comparten flujo.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    if bit_generator not in _BIT_GENERATORS:
+        raise ValueError(f"Bit generator no soportado: {bit_generator}")
+    return np.random.Generator(_BIT_GENERATORS[bit_generator](seed))
+
+
+def _as_seed_sequence(seed: Union[None, int, np.random.SeedSequence]) -> np.random.SeedSequence:
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        raise TypeError("No se pueden derivar flujos de un Generator; use una semilla o SeedSequence.")
+    return np.random.SeedSequence(seed)
+
+
+def spawn_seeds(
+    seed: Union[None, int, np.random.SeedSequence], n_streams: int, start: int = 0
+) -> List[np.random.SeedSequence]:
+    """
+    Deriva n_streams SeedSequence independientes a partir de la semilla raiz.
+    El flujo i depende solo de la raiz y de su indice (start + i), equivalente a SeedSequence.spawn,
+    asi que pedir mas flujos despues no altera los ya entregados.
+    """
+    if n_streams < 0 or start < 0:
+        raise ValueError("n_streams y start deben ser no negativos.")
+    root = _as_seed_sequence(seed)
+    return [
+        np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + (index,), pool_size=root.pool_size)
+        for index in range(start, start + n_streams)
+    ]
+
+
+def spawn_rngs(
+    seed: Union[None, int, np.random.SeedSequence], n_streams: int, bit_generator: str = "PCG64"
+) -> List[np.random.Generator]:
+    """Crea n_streams generadores independientes listos para repartir entre trabajadores."""
+    return [make_rng(child, bit_generator) for child in spawn_seeds(seed, n_streams)]
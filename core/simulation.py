@@ -3,39 +3,205 @@ Funciones basicas para generar datos y simular el comportamiento del Teorema Cen
 La idea: crear poblaciones con distintas formas y repetir muchas muestras independientes para mostrar
 que las medias muestrales se aproximan a una distribucion normal al aumentar el numero de simulaciones.
 """
-from typing import Callable, Dict
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
-from core.distributions import (
-    generate_binomial,
-    generate_exponential,
-    generate_uniform,
-)
+from core.distributions import get_distribution
+from core.histogram import DistributionSummary, summarize_array
+from core.metrics import RunningMoments
+from core.rng import SeedLike, make_rng, spawn_seeds
 
 
 def _get_generator(dist_name: str) -> Callable:
     """
-    Devuelve la funcion generadora segun el nombre de la distribucion.
-    Elegir el generador aqui desacopla la interfaz (string elegida en UI) de la implementacion real.
+    Devuelve la funcion generadora de la distribucion registrada con ese nombre (ver core.distributions).
+    Todos los generadores reciben los parametros de la distribucion, size y un np.random.Generator (rng).
     """
-    generators = {
-        "Uniforme": generate_uniform,
-        "Exponencial": generate_exponential,
-        "Binomial": generate_binomial,
-    }
-    if dist_name not in generators:
-        raise ValueError(f"Distribucion no soportada: {dist_name}")
-    return generators[dist_name]
+    return get_distribution(dist_name).sampler
 
 
-def generate_population(dist_name: str, dist_params: Dict[str, float], size: int) -> np.ndarray:
+def _get_mean_sampler(dist_name: str) -> Optional[Callable]:
+    """
+    Devuelve el muestreador directo de medias muestrales si la familia tiene uno, o None.
+    Las familias sin atajo (p. ej. Uniforme) usan la ruta generica de muestras crudas.
+    """
+    return get_distribution(dist_name).mean_sampler
+
+
+# Presupuesto de memoria por bloque de muestras crudas (bytes). El pico de memoria depende de este valor
+# y no de n_simulations * sample_size.
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+# Precision de los datos generados: "double" (float64, por defecto) o "single" (float32). Con "single" las familias
+# que numpy genera directamente en float32 ocupan la mitad por muestra y entran el doble de filas por bloque; las
+# que generan en float64/int64 y solo convertirian al final (Binomial, Poisson, Beta: native_single=False en el
+# registro) siguen en float64, porque el bloque de trabajo no se achica y la conversion sumaria una copia.
+# Las medias y los momentos se acumulan siempre en float64.
+PRECISIONS = {"double": np.float64, "single": np.float32}
+
+
+def _precision_dtype(precision: str, dist_name: Optional[str] = None) -> type:
+    """dtype con el que se generan las muestras; con dist_name, el de trabajo de esa familia."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Precision no soportada: {precision}")
+    dtype = PRECISIONS[precision]
+    if dist_name is not None and not get_distribution(dist_name).native_single:
+        return np.float64
+    return dtype
+
+
+def _rows_per_chunk(sample_size: int, chunk_bytes: int, dtype=np.float64) -> int:
+    """Cantidad de filas (muestras completas) que caben en el presupuesto de memoria de un bloque."""
+    if chunk_bytes <= 0:
+        raise ValueError("chunk_bytes debe ser positivo.")
+    row_bytes = sample_size * np.dtype(dtype).itemsize
+    return max(1, chunk_bytes // row_bytes)
+
+
+def generate_population(
+    dist_name: str, dist_params: Dict[str, float], size: int, rng: SeedLike = None, precision: str = "double"
+) -> np.ndarray:
     """
     Genera una poblacion grande para visualizacion.
     Sirve para mostrar la forma original (asimetrica o no) antes de aplicar el TCL con medias muestrales.
+    rng acepta una semilla, una SeedSequence o un np.random.Generator ya creado.
+    """
+    generator = _get_generator(dist_name)
+    return generator(**dist_params, size=size, rng=make_rng(rng), dtype=_precision_dtype(precision, dist_name))
+
+
+# Poblaciones mas grandes que esto no se materializan para graficar: se resumen con summarize_population.
+POPULATION_DISPLAY_SIZE = 200_000
+# Presupuesto por bloque al recorrer en streaming una poblacion que no se materializa.
+POPULATION_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def iter_population_chunks(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    size: int,
+    chunk_bytes: int = POPULATION_CHUNK_BYTES,
+    rng: SeedLike = None,
+    precision: str = "double",
+) -> Iterator[np.ndarray]:
+    """
+    Produce la poblacion por bloques consecutivos sin materializarla: concatenarlos da exactamente
+    generate_population con el mismo rng, y la memoria pico depende de chunk_bytes y no de size.
+    Para que el pico sea de un solo bloque, quien los recorre no debe retener el anterior mientras pide el siguiente.
+    """
+    if size <= 0:
+        raise ValueError("size debe ser positivo.")
+    dtype = _precision_dtype(precision, dist_name)
+    rng = make_rng(rng)
+    generator = _get_generator(dist_name)
+    # Bloques medidos en float64 aun en modo "single": quien los consume (RunningMoments) trabaja en float64, y con
+    # el doble de valores por bloque sus temporales superarian lo que se ahorra al generar en float32.
+    block = _rows_per_chunk(1, chunk_bytes, np.float64)
+    for start in range(0, size, block):
+        yield generator(**dist_params, size=min(block, size - start), rng=rng, dtype=dtype)
+
+
+def stratified_population_sample(
+    dist_name: str, dist_params: Dict[str, float], size: int, rng: SeedLike = None
+) -> np.ndarray:
+    """
+    Muestra estratificada de la distribucion: un valor por cada intervalo de probabilidad [i/size, (i+1)/size),
+    tomado con la funcion cuantil de la familia. Cada bin de un histograma recibe la cantidad esperada de datos
+    con error de a lo sumo uno, asi que size valores bastan para dibujar la forma de una poblacion mucho mayor.
+    Los valores salen ordenados de menor a mayor.
+    """
+    spec = get_distribution(dist_name)
+    if spec.ppf is None:
+        raise ValueError(f"La distribucion {dist_name} no tiene funcion cuantil.")
+    if size <= 0:
+        raise ValueError("size debe ser positivo.")
+    q = (np.arange(size) + make_rng(rng).random(size)) / size
+    return spec.ppf(q, **dist_params)
+
+
+def summarize_population(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    size: int,
+    display_bins: int,
+    display_size: int = POPULATION_DISPLAY_SIZE,
+    chunk_bytes: int = POPULATION_CHUNK_BYTES,
+    rng: SeedLike = None,
+    precision: str = "double",
+) -> DistributionSummary:
+    """
+    Resumen para graficar una poblacion de size valores sin materializarla (modo reducido).
+    Los momentos (media, desviacion, asimetria, curtosis, size) salen de una pasada en streaming por la poblacion
+    completa, con los mismos valores que generate_population con ese rng. El histograma, la KDE, los cuantiles y
+    el rango salen de una muestra estratificada de display_size valores (una muestra simple si la familia no
+    tiene funcion cuantil) tomada despues con el mismo rng. La memoria y el costo de graficar no dependen de size;
+    los momentos cuestan O(size) con memoria acotada por chunk_bytes.
+    """
+    rng = make_rng(rng)
+    moments = RunningMoments()
+    for chunk in iter_population_chunks(dist_name, dist_params, size, chunk_bytes, rng=rng, precision=precision):
+        moments.update(chunk)
+        # Sin esta referencia el bloque se libera antes de generar el siguiente.
+        del chunk
+    display_size = min(display_size, size)
+    if get_distribution(dist_name).ppf is not None:
+        sample = stratified_population_sample(dist_name, dist_params, display_size, rng=rng)
+    else:
+        sample = generate_population(dist_name, dist_params, display_size, rng=rng, precision=precision)
+    summary = summarize_array(sample, display_bins)
+    summary.moments = moments
+    return summary
+
+
+def iter_sample_mean_chunks(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    sample_size: int,
+    n_simulations: int,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    fast_path: bool = False,
+    rng: SeedLike = None,
+    precision: str = "double",
+) -> Iterator[np.ndarray]:
+    """
+    Produce las medias muestrales por bloques de filas consecutivas.
+    Cada bloque genera a lo sumo chunk_bytes de muestras crudas, de modo que la memoria pico
+    no crece con n_simulations. Concatenar los bloques equivale a generar la matriz completa.
+    Con fast_path=True las medias se generan directamente de su distribucion exacta cuando existe.
+    Con precision="single" las muestras crudas se generan en float32 (o enteros chicos) y cada media se
+    acumula en float64; las medias siempre son float64.
+    Todos los bloques salen del mismo generador (rng), en orden.
     """
+    if sample_size <= 0 or n_simulations <= 0:
+        raise ValueError("sample_size y n_simulations deben ser positivos.")
+
+    dtype = _precision_dtype(precision, dist_name)
+    rng = make_rng(rng)
+    mean_sampler = _get_mean_sampler(dist_name) if fast_path else None
+    if mean_sampler is not None:
+        n_means = _rows_per_chunk(1, chunk_bytes)
+        for start in range(0, n_simulations, n_means):
+            n_block = min(n_means, n_simulations - start)
+            yield mean_sampler(**dist_params, sample_size=sample_size, size=n_block, rng=rng)
+        return
+
     generator = _get_generator(dist_name)
-    return generator(**dist_params, size=size)
+    rows = _rows_per_chunk(sample_size, chunk_bytes, dtype)
+    for start in range(0, n_simulations, rows):
+        n_rows = min(rows, n_simulations - start)
+        # Los generadores consumen el flujo aleatorio en orden de filas, por lo que generar por bloques
+        # produce exactamente los mismos valores que una sola llamada con size=(n_simulations, sample_size).
+        samples = generator(**dist_params, size=(n_rows, sample_size), rng=rng, dtype=dtype)
+        # Acumulador float64 aun con muestras float32: numpy convierte por buffers, sin copiar el bloque.
+        means = samples.mean(axis=1, dtype=np.float64)
+        # Se libera el bloque antes de ceder: el generador queda suspendido en el yield mientras se genera el
+        # siguiente, y si siguiera referenciado habria dos bloques vivos a la vez.
+        del samples
+        yield means
 
 
 def simulate_sample_means(
@@ -43,18 +209,372 @@ def simulate_sample_means(
     dist_params: Dict[str, float],
     sample_size: int,
     n_simulations: int,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    fast_path: bool = False,
+    rng: SeedLike = None,
+    precision: str = "double",
 ) -> np.ndarray:
     """
     Genera n_simulations muestras de tamano sample_size, calcula sus medias
     y devuelve un arreglo con las medias muestrales.
     Este es el paso clave donde se evidencia el TCL: sin importar la forma original,
     la distribucion de estas medias tiende a ser normal si k (n_simulations) es grande.
+    Las muestras se generan por bloques (ver iter_sample_mean_chunks) para acotar la memoria pico.
+    Con fast_path=True se omiten las muestras crudas en las familias con distribucion exacta de la media;
+    el resultado es estadisticamente equivalente pero no identico valor a valor a la ruta generica.
+    Con la misma semilla en rng el resultado es reproducible e independiente de chunk_bytes.
+    precision="single" genera las muestras crudas en float32 (ver iter_sample_mean_chunks): otro flujo de valores,
+    estadisticamente equivalente, con la mitad de memoria y ancho de banda por muestra.
     """
     if sample_size <= 0 or n_simulations <= 0:
         raise ValueError("sample_size y n_simulations deben ser positivos.")
 
+    sample_means = np.empty(n_simulations, dtype=np.float64)
+    start = 0
+    # Usamos RNG vectorizado por bloque para eficiencia (mas rapido que bucles) sin materializar toda la matriz.
+    chunks = iter_sample_mean_chunks(
+        dist_name, dist_params, sample_size, n_simulations, chunk_bytes, fast_path, rng=rng, precision=precision
+    )
+    for chunk in chunks:
+        sample_means[start : start + len(chunk)] = chunk
+        start += len(chunk)
+    return sample_means
+
+
+def simulate_prefix_means(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    n_values: Sequence[int],
+    n_simulations: int,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    rng: SeedLike = None,
+) -> np.ndarray:
+    """
+    Medias muestrales para varios tamanos de muestra a partir de una sola simulacion.
+    Se generan n_simulations filas de longitud max(n_values) (por bloques, como iter_sample_mean_chunks) y con
+    sumas acumuladas por fila se obtiene la media de cada prefijo de longitud n. Devuelve un arreglo
+    (len(n_values), n_simulations): la fila i son las medias con n = n_values[i].
+    Las medias de distintos n comparten muestras (son prefijos de las mismas filas), por lo que no son
+    independientes entre si; cada fila por separado tiene la distribucion correcta.
+    Las filas con n = max(n_values) son identicas a simulate_sample_means con el mismo rng y chunk_bytes; las
+    demas salen de sumas acumuladas y coinciden con una media directa salvo redondeo.
+    """
+    n_values = np.asarray(n_values, dtype=np.int64)
+    if n_values.ndim != 1 or n_values.size == 0 or n_values.min() <= 0 or n_simulations <= 0:
+        raise ValueError("n_values y n_simulations deben ser positivos.")
+
+    rng = make_rng(rng)
     generator = _get_generator(dist_name)
-    # Usamos RNG vectorizado para eficiencia y reproducibilidad con la API de numpy (mas rapido que bucles).
-    samples = generator(**dist_params, size=(n_simulations, sample_size))
-    sample_means = samples.mean(axis=1)
+    n_max = int(n_values.max())
+    means = np.empty((n_values.size, n_simulations), dtype=np.float64)
+    rows = _rows_per_chunk(n_max, chunk_bytes)
+    for start in range(0, n_simulations, rows):
+        n_rows = min(rows, n_simulations - start)
+        samples = generator(**dist_params, size=(n_rows, n_max), rng=rng)
+        # Las filas de n = max(n_values) usan la misma media que simulate_sample_means (suma por pares), asi que
+        # son identicas a esa funcion con la misma semilla; la suma acumulada daria diferencias de redondeo.
+        full_mean = samples.mean(axis=1, dtype=np.float64)
+        # La suma acumulada se hace en el mismo bloque para no duplicar la memoria pico.
+        sums = np.cumsum(samples, axis=1, out=samples if samples.dtype == np.float64 else None)
+        means[:, start : start + n_rows] = (sums[:, n_values - 1] / n_values).T
+        means[n_values == n_max, start : start + n_rows] = full_mean
+        # El bloque se libera antes de generar el siguiente (si no, habria dos vivos a la vez).
+        del samples, sums
+    return means
+
+
+# Numero de simulaciones por fragmento en el backend paralelo. Cada fragmento usa su propio flujo aleatorio
+# derivado de la semilla, asi que el resultado depende de la semilla y de shard_size, no de los trabajadores.
+DEFAULT_SHARD_SIZE = 16_384
+
+_BACKENDS = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+def _shard_bounds(n_simulations: int, shard_size: int) -> List[Tuple[int, int]]:
+    """Divide [0, n_simulations) en intervalos consecutivos de a lo sumo shard_size simulaciones."""
+    if shard_size <= 0:
+        raise ValueError("shard_size debe ser positivo.")
+    return [(start, min(start + shard_size, n_simulations)) for start in range(0, n_simulations, shard_size)]
+
+
+def _simulate_shard(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    sample_size: int,
+    n_simulations: int,
+    chunk_bytes: int,
+    fast_path: bool,
+    seed: np.random.SeedSequence,
+    precision: str = "double",
+) -> np.ndarray:
+    """Tarea de un trabajador: simula un fragmento con su propio generador (funcion de modulo para poder serializarla)."""
+    return simulate_sample_means(
+        dist_name,
+        dist_params,
+        sample_size,
+        n_simulations,
+        chunk_bytes,
+        fast_path,
+        rng=make_rng(seed),
+        precision=precision,
+    )
+
+
+def _fill_shards(out: np.ndarray, bounds: List[Tuple[int, int]], results: Iterator[np.ndarray]) -> None:
+    """Copia cada fragmento en su posicion; los resultados llegan en el orden de los fragmentos."""
+    for (start, stop), shard_means in zip(bounds, results):
+        out[start:stop] = shard_means
+
+
+def simulate_sample_means_parallel(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    sample_size: int,
+    n_simulations: int,
+    seed: Union[None, int, np.random.SeedSequence] = None,
+    n_workers: Optional[int] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    backend: str = "thread",
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    fast_path: bool = False,
+    precision: str = "double",
+) -> np.ndarray:
+    """
+    Version multinucleo de simulate_sample_means.
+    Las n_simulations se reparten en fragmentos de shard_size; el fragmento i usa el flujo i derivado de seed
+    (SeedSequence.spawn) y las medias se concatenan en orden. Para una semilla dada el resultado es el mismo
+    con cualquier n_workers o backend ("thread": numpy libera el GIL al generar; "process": procesos separados).
+    La memoria pico es del orden de n_workers * chunk_bytes.
+    """
+    if sample_size <= 0 or n_simulations <= 0:
+        raise ValueError("sample_size y n_simulations deben ser positivos.")
+    if backend not in _BACKENDS:
+        raise ValueError(f"Backend no soportado: {backend}")
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_workers <= 0:
+        raise ValueError("n_workers debe ser positivo.")
+    _precision_dtype(precision)
+
+    if not isinstance(seed, np.random.SeedSequence):
+        # Fijamos la raiz una sola vez para que todos los fragmentos deriven de la misma entropia.
+        seed = np.random.SeedSequence(seed)
+    bounds = _shard_bounds(n_simulations, shard_size)
+    shard_seeds = spawn_seeds(seed, len(bounds))
+    tasks = [
+        (dist_name, dist_params, sample_size, stop - start, chunk_bytes, fast_path, shard_seed, precision)
+        for (start, stop), shard_seed in zip(bounds, shard_seeds)
+    ]
+
+    sample_means = np.empty(n_simulations, dtype=np.float64)
+    if n_workers == 1 or len(tasks) == 1:
+        _fill_shards(sample_means, bounds, (_simulate_shard(*task) for task in tasks))
+        return sample_means
+
+    with _BACKENDS[backend](max_workers=min(n_workers, len(tasks))) as executor:
+        _fill_shards(sample_means, bounds, executor.map(_simulate_shard, *zip(*tasks)))
     return sample_means
+
+
+class IncrementalSampleMeans:
+    """
+    Medias muestrales que crecen a demanda al aumentar k, sin regenerar las ya calculadas.
+    Sigue el mismo esquema de fragmentos que simulate_sample_means_parallel y conserva el generador del
+    ultimo fragmento incompleto, asi que get(k) es identico bit a bit a una corrida nueva con la misma
+    semilla y shard_size. Pedir un k menor devuelve un prefijo sin generar nada.
+    """
+
+    def __init__(
+        self,
+        dist_name: str,
+        dist_params: Dict[str, float],
+        sample_size: int,
+        seed: Union[None, int, np.random.SeedSequence] = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        fast_path: bool = False,
+        precision: str = "double",
+    ) -> None:
+        if sample_size <= 0:
+            raise ValueError("sample_size debe ser positivo.")
+        if shard_size <= 0:
+            raise ValueError("shard_size debe ser positivo.")
+        _get_generator(dist_name)
+        _precision_dtype(precision)
+        self.dist_name = dist_name
+        self.dist_params = dict(dist_params)
+        self.sample_size = sample_size
+        self.shard_size = shard_size
+        self.chunk_bytes = chunk_bytes
+        self.fast_path = fast_path
+        self.precision = precision
+        self._seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self._means = np.empty(0, dtype=np.float64)
+        self._count = 0
+        self._rng: Optional[np.random.Generator] = None
+        self._lock = threading.Lock()
+
+    @property
+    def n_computed(self) -> int:
+        """Cantidad de medias ya generadas."""
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._means.nbytes)
+
+    def get(self, n_simulations: int, n_workers: int = 1) -> np.ndarray:
+        """Devuelve las primeras n_simulations medias (vista de solo lectura), generando solo las faltantes."""
+        if n_simulations <= 0:
+            raise ValueError("n_simulations debe ser positivo.")
+        with self._lock:
+            if n_simulations > self._count:
+                self._extend(n_simulations, n_workers)
+            view = self._means[:n_simulations]
+        view.flags.writeable = False
+        return view
+
+    def _extend(self, n_simulations: int, n_workers: int) -> None:
+        if n_simulations > len(self._means):
+            grown = np.empty(max(n_simulations, int(len(self._means) * 1.5)), dtype=np.float64)
+            grown[: self._count] = self._means[: self._count]
+            self._means = grown
+
+        # Cada tramo completa un fragmento; el primero puede continuar el generador guardado.
+        tasks = []
+        position = self._count
+        while position < n_simulations:
+            shard_index, offset = divmod(position, self.shard_size)
+            if offset == 0:
+                self._rng = make_rng(spawn_seeds(self._seed, 1, start=shard_index)[0])
+            stop = min((shard_index + 1) * self.shard_size, n_simulations)
+            tasks.append((position, stop, self._rng))
+            position = stop
+
+        def run(task: Tuple[int, int, np.random.Generator]) -> None:
+            start, stop, rng = task
+            self._means[start:stop] = simulate_sample_means(
+                self.dist_name,
+                self.dist_params,
+                self.sample_size,
+                stop - start,
+                self.chunk_bytes,
+                self.fast_path,
+                rng=rng,
+                precision=self.precision,
+            )
+
+        # Hilos y no procesos: el generador de cada fragmento debe avanzar en este proceso para poder continuarlo.
+        if n_workers <= 1 or len(tasks) == 1:
+            for task in tasks:
+                run(task)
+        else:
+            with ThreadPoolExecutor(max_workers=min(n_workers, len(tasks))) as executor:
+                list(executor.map(run, tasks))
+        self._count = n_simulations
+
+
+# Valores crudos (sample_size * medias) por paso de una corrida en segundo plano: acota cada cuanto hay
+# resultados parciales nuevos y cuanto tarda en atenderse una cancelacion.
+PROGRESS_STEP_VALUES = 1 << 21
+
+
+class BackgroundSimulation:
+    """
+    Extiende un IncrementalSampleMeans hasta n_simulations en segundo plano, por pasos de step medias, para que
+    la interfaz muestre resultados parciales (snapshot) mientras corre. cancel() la detiene al terminar el paso
+    en curso; las medias ya generadas quedan en la simulacion incremental y las reaprovecha la siguiente corrida.
+    Como IncrementalSampleMeans no depende de como se lo extienda, el resultado final es identico bit a bit al
+    de una corrida bloqueante con la misma semilla.
+    """
+
+    def __init__(
+        self,
+        simulation: IncrementalSampleMeans,
+        n_simulations: int,
+        n_workers: int = 1,
+        step: Optional[int] = None,
+        on_step: Optional[Callable[[IncrementalSampleMeans], None]] = None,
+    ) -> None:
+        if n_simulations <= 0:
+            raise ValueError("n_simulations debe ser positivo.")
+        if step is None:
+            step = max(1, PROGRESS_STEP_VALUES // simulation.sample_size)
+        if step <= 0:
+            raise ValueError("step debe ser positivo.")
+        self.simulation = simulation
+        self.n_simulations = n_simulations
+        self.n_workers = n_workers
+        self.step = step
+        # Se llama tras cada paso con la simulacion extendida (p. ej. para actualizar su tamano en un cache).
+        self.on_step = on_step
+        self._cancelled = threading.Event()
+        self._future: Optional[Future] = None
+        self._snapshot: Optional[DistributionSummary] = None
+        self._snapshot_count = 0
+
+    def start(self, executor: Executor) -> "BackgroundSimulation":
+        """Lanza la corrida en el executor (de hilos: la simulacion incremental vive en este proceso)."""
+        if self._future is not None:
+            raise ValueError("La simulacion ya fue iniciada.")
+        self._future = executor.submit(self._run)
+        return self
+
+    def _run(self) -> None:
+        position = self.simulation.n_computed
+        while position < self.n_simulations and not self._cancelled.is_set():
+            position = min(self.n_simulations, position + self.step)
+            self.simulation.get(position, self.n_workers)
+            if self.on_step is not None:
+                self.on_step(self.simulation)
+
+    @property
+    def n_done(self) -> int:
+        """Medias disponibles para esta corrida."""
+        return min(self.simulation.n_computed, self.n_simulations)
+
+    @property
+    def progress(self) -> float:
+        return self.n_done / self.n_simulations
+
+    @property
+    def done(self) -> bool:
+        """True si la corrida termino, fue cancelada y se detuvo, o fallo."""
+        return self._future is not None and self._future.done()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def result(self, timeout: Optional[float] = None) -> np.ndarray:
+        """Espera el final y devuelve las medias (propaga el error de la corrida si fallo)."""
+        if self._future is None:
+            raise ValueError("La simulacion no fue iniciada.")
+        self._future.result(timeout)
+        if self.n_done < self.n_simulations:
+            raise ValueError("La simulacion fue cancelada antes de terminar.")
+        return self.simulation.get(self.n_simulations)
+
+    def partial_means(self) -> np.ndarray:
+        """Medias generadas hasta ahora (vista de solo lectura; vacia si todavia no hay ninguna)."""
+        n_done = self.n_done
+        return self.simulation.get(n_done) if n_done else np.empty(0)
+
+    def snapshot(self, display_bins: int) -> Optional[DistributionSummary]:
+        """
+        Histograma, momentos y cuantiles de las medias generadas hasta ahora, o None con menos de dos.
+        Se recalcula solo si hubo avance desde el ultimo snapshot.
+        """
+        n_done = self.n_done
+        if n_done < 2:
+            return None
+        if self._snapshot is None or n_done != self._snapshot_count:
+            self._snapshot = summarize_array(self.simulation.get(n_done), display_bins)
+            self._snapshot_count = n_done
+        return self._snapshot
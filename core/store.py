@@ -0,0 +1,129 @@
+"""
+Almacen en disco de resultados de simulacion (poblaciones, medias muestrales) como archivos .npy.
+Cada resultado se identifica por su clave canonica (ver core.cache.make_key, incluye la semilla) y se guarda
+en un archivo propio junto a un JSON de metadatos. La escritura es por bloques sobre un memmap, y la lectura
+usa np.load(mmap_mode="r"): recargar un arreglo de 10^8 elementos es instantaneo y solo se leen
+del disco las paginas que realmente se usan. Como las paginas mapeadas viven en el cache del sistema operativo,
+varios procesos que leen el mismo arreglo comparten una sola copia en RAM.
+Los resultados que no son arreglos (resumenes, PNG) se guardan con pickle (write_object/read_object); solo
+deben leerse de directorios de confianza.
+"""
+import hashlib
+import json
+import os
+import pickle
+import uuid
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+import numpy as np
+
+
+class ResultStore:
+    """Directorio con un .npy (columna unidimensional) y un .json de metadatos por clave."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _digest(self, key: Hashable) -> str:
+        encoded = json.dumps(key, sort_keys=True, default=repr).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def path(self, key: Hashable) -> str:
+        """Ruta del .npy asociado a la clave."""
+        return os.path.join(self.root, f"{self._digest(key)}.npy")
+
+    def __contains__(self, key: Hashable) -> bool:
+        return os.path.exists(self.path(key))
+
+    def read(self, key: Hashable) -> Optional[np.ndarray]:
+        """Arreglo de solo lectura mapeado en memoria (sin copiarlo a RAM), o None si no existe."""
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode="r")
+
+    def metadata(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        path = self.path(key)[: -len(".npy")] + ".json"
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def write(
+        self,
+        key: Hashable,
+        chunks: Iterable[np.ndarray],
+        length: int,
+        dtype=np.float64,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> np.ndarray:
+        """
+        Escribe un arreglo de `length` elementos a partir de bloques consecutivos, sin tenerlo completo en memoria.
+        Se escribe en un archivo temporal que se renombra al final, de modo que un lector nunca ve un archivo
+        a medio escribir. Devuelve el resultado ya mapeado para lectura.
+        """
+        path = self.path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=(length,))
+        try:
+            position = 0
+            for chunk in chunks:
+                chunk = np.asarray(chunk).ravel()
+                if position + chunk.size > length:
+                    raise ValueError("Los bloques superan la longitud declarada.")
+                out[position : position + chunk.size] = chunk
+                position += chunk.size
+            if position != length:
+                raise ValueError(f"Se escribieron {position} elementos de {length} declarados.")
+            out.flush()
+        except BaseException:
+            del out
+            os.remove(tmp_path)
+            raise
+        del out
+
+        info = {"key": key, "length": length, "dtype": np.dtype(dtype).str}
+        info.update(metadata or {})
+        with open(path[: -len(".npy")] + ".json", "w", encoding="utf-8") as handle:
+            json.dump(info, handle, default=repr)
+        os.replace(tmp_path, path)
+        return self.read(key)
+
+    def write_array(self, key: Hashable, data: np.ndarray, metadata: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        data = np.asarray(data).ravel()
+        return self.write(key, [data], data.size, data.dtype, metadata)
+
+    def _object_path(self, key: Hashable) -> str:
+        return os.path.join(self.root, f"{self._digest(key)}.pkl")
+
+    def has_object(self, key: Hashable) -> bool:
+        return os.path.exists(self._object_path(key))
+
+    def read_object(self, key: Hashable) -> Any:
+        """Objeto guardado con write_object, o None si no existe."""
+        path = self._object_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as handle:
+            return pickle.load(handle)
+
+    def write_object(self, key: Hashable, value: Any) -> Any:
+        """Guarda un objeto con pickle (archivo temporal renombrado al final, como write) y lo devuelve."""
+        path = self._object_path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as handle:
+                pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+        return value
+
+    def delete(self, key: Hashable) -> None:
+        path = self.path(key)
+        for target in (path, path[: -len(".npy")] + ".json", self._object_path(key)):
+            if os.path.exists(target):
+                os.remove(target)
@@ -0,0 +1,379 @@
+"""
+Ejecucion por lotes (sin Streamlit) de barridos de parametros sobre simulate_sample_means.
+Cada configuracion (distribucion, parametros, n, k) produce una fila con metricas teoricas y empiricas
+(incluidos los diagnosticos de normalidad: KS, Anderson-Darling y la cota de Berry-Esseen) que se escribe
+al CSV de salida apenas termina, sin acumular resultados en memoria. Las medias se procesan por bloques
+con RunningMoments y un histograma fino, asi que tampoco se materializa el arreglo de cada corrida.
+
+Uso:
+    python -m core.sweep barrido.json -o resultados.csv [--workers 8] [--resume] [--store DIR] [--profile perfil.json]
+
+Con --store las medias de cada configuracion se guardan por bloques en un ResultStore (core.store).
+
+Formato del barrido (JSON); cada valor puede ser un escalar, una lista o un rango {"start", "stop", "step"}
+con stop incluido:
+    {
+        "distributions": [
+            {"name": "Exponencial", "params": {"lam": [0.5, 1.0]}},
+            {"name": "Binomial", "params": {"n_trials": 20, "p": [0.1, 0.5]}}
+        ],
+        "sample_size": {"start": 5, "stop": 500, "step": 5},
+        "n_simulations": 10000,
+        "seed": 2024,
+        "fast_path": false,
+        "precision": "double"
+    }
+
+"precision": "single" genera las muestras crudas en float32 con la mitad de memoria y ancho de banda en las familias
+que numpy genera asi (Binomial, Poisson y Beta siguen en float64, ver core.simulation.PRECISIONS); los momentos
+de las medias se acumulan igual en float64.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, as_completed, wait
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from core.cache import make_key
+from core.distributions import get_distribution
+from core.histogram import HistogramAccumulator
+from core.metrics import RunningMoments, compute_normality_diagnostics, compute_theoretical_stats
+from core.profiling import Profiler, profile_stage, use_profiler
+from core.rng import make_rng, spawn_seeds
+from core.simulation import DEFAULT_CHUNK_BYTES, PRECISIONS, iter_sample_mean_chunks
+from core.store import ResultStore
+
+FIELDNAMES = [
+    "job_id",
+    "dist_name",
+    "dist_params",
+    "sample_size",
+    "n_simulations",
+    "seed",
+    "theoretical_mean",
+    "theoretical_std",
+    "theoretical_se",
+    "empirical_mean",
+    "empirical_std",
+    "empirical_skewness",
+    "empirical_kurtosis",
+    "diff_mean",
+    "diff_std",
+    "ks",
+    "ks_upper",
+    "anderson_darling",
+    "berry_esseen",
+    "seconds",
+]
+
+# Histograma de las medias para los diagnosticos de normalidad: rango fijo de +-8 errores estandar alrededor
+# de la media teorica (lo que cae fuera se cuenta aparte), asi se acumula por bloques sin conocer min/max.
+DIAGNOSTIC_BINS = 4096
+DIAGNOSTIC_SPAN_SE = 8.0
+
+
+def _expand_values(value: Any) -> List[Any]:
+    """Normaliza un valor del barrido a lista: escalar, lista o rango inclusivo {"start", "stop", "step"}."""
+    if isinstance(value, dict):
+        start, stop, step = value["start"], value["stop"], value.get("step", 1)
+        if step <= 0:
+            raise ValueError("step debe ser positivo.")
+        if all(isinstance(v, int) for v in (start, stop, step)):
+            return list(range(start, stop + 1, step))
+        # Con flotantes, (stop - start) / step puede quedar apenas por debajo del entero (0.1 a 1.1 en pasos de 0.2
+        # da 4.999...): la tolerancia conserva stop, y el redondeo quita la deriva (0.30000000000000004) que si no
+        # llegaria al CSV y a las claves de reanudacion.
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return [round(start + i * step, 12) for i in range(count)]
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def expand_sweep(spec: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Genera las configuraciones del barrido en un orden estable. job_index identifica el flujo aleatorio
+    de cada configuracion y job_id la identifica en el archivo de salida (para reanudar).
+    Cada configuracion lleva la media y desviacion teoricas de la poblacion, calculadas por distribucion
+    sobre todas las combinaciones de parametros a la vez (los momentos del registro estan vectorizados).
+    """
+    sample_sizes = _expand_values(spec["sample_size"])
+    n_simulations = _expand_values(spec["n_simulations"])
+    job_index = 0
+    for dist in spec["distributions"]:
+        names = sorted(dist.get("params", {}))
+        grids = [_expand_values(dist["params"][name]) for name in names]
+        combos = [dict(zip(names, values)) for values in itertools.product(*grids)]
+        # Momentos teoricos de todas las combinaciones de parametros en una sola llamada vectorizada.
+        columns = {name: np.array([combo[name] for combo in combos]) for name in names}
+        pop_means, pop_stds = get_distribution(dist["name"]).moments(**columns)
+        pop_means = np.broadcast_to(pop_means, len(combos))
+        pop_stds = np.broadcast_to(pop_stds, len(combos))
+        for dist_params, pop_mean, pop_std in zip(combos, pop_means, pop_stds):
+            for sample_size, k in itertools.product(sample_sizes, n_simulations):
+                params_text = json.dumps(dist_params, sort_keys=True)
+                yield {
+                    "job_index": job_index,
+                    "job_id": f"{dist['name']}|{params_text}|n={sample_size}|k={k}",
+                    "dist_name": dist["name"],
+                    "dist_params": dist_params,
+                    "sample_size": int(sample_size),
+                    "n_simulations": int(k),
+                    "theoretical_mean": float(pop_mean),
+                    "theoretical_std": float(pop_std),
+                }
+                job_index += 1
+
+
+def job_key(job: Dict[str, Any], seed: int, fast_path: bool = False, precision: str = "double") -> Hashable:
+    """Clave del ResultStore para las medias de una configuracion."""
+    parts = [
+        "sweep_means",
+        job["dist_name"],
+        job["dist_params"],
+        job["sample_size"],
+        job["n_simulations"],
+        seed,
+        job["job_index"],
+        fast_path,
+    ]
+    # La precision solo entra en la clave si no es la de siempre, asi los almacenes previos siguen sirviendo.
+    if precision != "double":
+        parts.append(precision)
+    return make_key(*parts)
+
+
+def run_job(
+    job: Dict[str, Any],
+    seed: int,
+    fast_path: bool = False,
+    store_dir: Optional[str] = None,
+    precision: str = "double",
+) -> Dict[str, Any]:
+    """Ejecuta una configuracion y devuelve su fila de resultados (funcion de modulo para poder serializarla)."""
+    start = time.perf_counter()
+    rng = make_rng(spawn_seeds(seed, 1, start=job["job_index"])[0])
+    with profile_stage("teoricos"):
+        if "theoretical_std" in job:
+            # Calculados en expand_sweep para todo el barrido de una vez.
+            pop_std = job["theoretical_std"]
+            theoretical = {"mean": job["theoretical_mean"], "std": pop_std, "se": pop_std / np.sqrt(job["sample_size"])}
+        else:
+            theoretical = compute_theoretical_stats(job["dist_name"], job["dist_params"], job["sample_size"])
+    moments = RunningMoments()
+    span = DIAGNOSTIC_SPAN_SE * theoretical["se"]
+    # Con media o varianza infinitas (p. ej. Pareto con alpha <= 2) no hay normal de referencia ni rango para el
+    # histograma: se omiten los diagnosticos (quedan en NaN) y el barrido sigue con las demas configuraciones.
+    has_reference = bool(np.isfinite(theoretical["mean"]) and np.isfinite(span))
+    histogram = (
+        HistogramAccumulator(theoretical["mean"] - span, theoretical["mean"] + span, DIAGNOSTIC_BINS)
+        if has_reference
+        else None
+    )
+    chunks = iter_sample_mean_chunks(
+        job["dist_name"],
+        job["dist_params"],
+        job["sample_size"],
+        job["n_simulations"],
+        DEFAULT_CHUNK_BYTES,
+        fast_path,
+        rng=rng,
+        precision=precision,
+    )
+
+    def accumulate(blocks: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+        for block in blocks:
+            moments.update(block)
+            if histogram is not None:
+                histogram.update(block)
+            yield block
+
+    with profile_stage("simulacion"):
+        if store_dir is None:
+            for _ in accumulate(chunks):
+                pass
+        else:
+            key = job_key(job, seed, fast_path, precision)
+            ResultStore(store_dir).write(key, accumulate(chunks), job["n_simulations"])
+    if histogram is None:
+        diagnostics = {field: float("nan") for field in ("ks", "ks_upper", "anderson_darling", "berry_esseen")}
+    else:
+        with profile_stage("diagnosticos"):
+            diagnostics = compute_normality_diagnostics(
+                job["dist_name"],
+                job["dist_params"],
+                job["sample_size"],
+                moments,
+                histogram.edges,
+                histogram.counts,
+                histogram.underflow,
+                histogram.overflow,
+                theoretical=theoretical,
+            )
+    return {
+        "job_id": job["job_id"],
+        "dist_name": job["dist_name"],
+        "dist_params": json.dumps(job["dist_params"], sort_keys=True),
+        "sample_size": job["sample_size"],
+        "n_simulations": job["n_simulations"],
+        "seed": seed,
+        "theoretical_mean": theoretical["mean"],
+        "theoretical_std": theoretical["std"],
+        "theoretical_se": theoretical["se"],
+        "empirical_mean": moments.mean,
+        "empirical_std": moments.std,
+        "empirical_skewness": moments.skewness,
+        "empirical_kurtosis": moments.kurtosis,
+        "diff_mean": abs(moments.mean - theoretical["mean"]),
+        "diff_std": abs(moments.std - theoretical["se"]),
+        "ks": diagnostics["ks"],
+        "ks_upper": diagnostics["ks_upper"],
+        "anderson_darling": diagnostics["anderson_darling"],
+        "berry_esseen": diagnostics["berry_esseen"],
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _run_profiled_job(
+    job: Dict[str, Any], seed: int, fast_path: bool, store_dir: Optional[str], precision: str = "double"
+) -> Tuple[Dict[str, Any], Profiler]:
+    """run_job con un Profiler activo (solo totales por etapa) que vuelve al proceso principal."""
+    profiler = Profiler(keep_records=False)
+    with use_profiler(profiler):
+        row = run_job(job, seed, fast_path, store_dir, precision)
+    profiler.close()
+    return row, profiler
+
+
+def _completed_job_ids(path: str) -> Set[str]:
+    """job_id ya escritos en una salida previa (las filas incompletas de una corrida cortada se ignoran)."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, newline="", encoding="utf-8") as handle:
+        return {row["job_id"] for row in csv.DictReader(handle) if row.get("seconds")}
+
+
+def _check_header(path: str) -> None:
+    """Una salida previa con otras columnas (de una version anterior) no se puede continuar."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, newline="", encoding="utf-8") as handle:
+        header = next(csv.reader(handle), [])
+    if header != FIELDNAMES:
+        raise ValueError(f"{path} tiene columnas distintas a las de esta version; no se puede reanudar.")
+
+
+def _terminate_partial_line(path: str) -> None:
+    """Si la corrida anterior se corto a mitad de una fila, cierra esa linea antes de seguir escribiendo."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "rb+") as handle:
+        handle.seek(-1, os.SEEK_END)
+        if handle.read(1) != b"\n":
+            handle.write(b"\n")
+
+
+def run_sweep(
+    spec: Dict[str, Any],
+    output_path: str,
+    n_workers: int = 1,
+    resume: bool = False,
+    store_dir: Optional[str] = None,
+    profile_path: Optional[str] = None,
+) -> int:
+    """
+    Ejecuta el barrido escribiendo una fila por configuracion en output_path (CSV) a medida que terminan.
+    Con resume=True se omiten las configuraciones que ya estan en el archivo. Devuelve cuantas se ejecutaron.
+    Como maximo hay 2 * n_workers configuraciones en vuelo, asi que la memoria no crece con el barrido.
+    Con store_dir las medias de cada configuracion se persisten en un ResultStore (clave: job_key).
+    Con profile_path se escriben en ese JSON los totales por etapa (tiempo, memoria) de todas las configuraciones.
+    """
+    if os.path.exists(output_path) and not resume:
+        raise FileExistsError(f"{output_path} ya existe; use resume=True para continuar el barrido.")
+    seed = int(spec.get("seed", 0))
+    fast_path = bool(spec.get("fast_path", False))
+    precision = str(spec.get("precision", "double"))
+    if precision not in PRECISIONS:
+        raise ValueError(f"Precision no soportada: {precision}")
+    if resume:
+        _check_header(output_path)
+        _terminate_partial_line(output_path)
+    done = _completed_job_ids(output_path) if resume else set()
+    pending = (job for job in expand_sweep(spec) if job["job_id"] not in done)
+
+    write_header = not os.path.exists(output_path) or os.path.getsize(output_path) == 0
+    profiler = Profiler(keep_records=False) if profile_path else None
+    worker = _run_profiled_job if profiler is not None else run_job
+    executed = 0
+    with open(output_path, "a", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=FIELDNAMES)
+        if write_header:
+            writer.writeheader()
+
+        def write(result: Any) -> None:
+            if profiler is not None:
+                result, job_profiler = result
+                profiler.merge(job_profiler)
+            writer.writerow(result)
+            # Se vacia el buffer por fila para que una interrupcion pierda como mucho las corridas en vuelo.
+            handle.flush()
+
+        if n_workers <= 1:
+            for job in pending:
+                write(worker(job, seed, fast_path, store_dir, precision))
+                executed += 1
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as executor:
+                in_flight: Set[Future] = set()
+                for job in pending:
+                    if len(in_flight) >= 2 * n_workers:
+                        finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            write(future.result())
+                            executed += 1
+                    in_flight.add(executor.submit(worker, job, seed, fast_path, store_dir, precision))
+                for future in as_completed(in_flight):
+                    write(future.result())
+                    executed += 1
+
+    if profiler is not None:
+        profiler.to_json(profile_path)
+    return executed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Barrido por lotes de simulaciones del TCL.")
+    parser.add_argument("spec", help="Archivo JSON con la especificacion del barrido.")
+    parser.add_argument("-o", "--output", required=True, help="CSV de salida (una fila por configuracion).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos en paralelo.")
+    parser.add_argument("--resume", action="store_true", help="Continua un barrido interrumpido.")
+    parser.add_argument("--store", default=None, help="Directorio donde persistir las medias de cada configuracion.")
+    parser.add_argument("--profile", default=None, help="JSON donde exportar tiempos y memoria por etapa.")
+    args = parser.parse_args(argv)
+
+    with open(args.spec, encoding="utf-8") as handle:
+        spec = json.load(handle)
+    try:
+        executed = run_sweep(
+            spec,
+            args.output,
+            n_workers=args.workers,
+            resume=args.resume,
+            store_dir=args.store,
+            profile_path=args.profile,
+        )
+    except (FileExistsError, ValueError) as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 2
+    print(f"{executed} configuraciones ejecutadas; resultados en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
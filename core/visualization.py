@@ -1,12 +1,24 @@
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, List, Optional
 
-import matplotlib.pyplot as plt
 import numpy as np
-from scipy.stats import gaussian_kde, norm, skew
 
+from core.histogram import DistributionSummary, summarize_array
+from core.profiling import profile_stage
 
-def _describe_shape(data: np.ndarray) -> str:
-    skewness = skew(data)
+# matplotlib se importa dentro de cada funcion: cargarlo cuesta la mayor parte del arranque
+# y las corridas sin graficos (simulacion headless, trabajadores) no deben pagarlo.
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+POPULATION_BINS = 40
+SAMPLE_MEANS_BINS = 30
+
+FIGURE_SIZE = (6.2, 4.2)
+FIGURE_MARGINS = {"left": 0.14, "bottom": 0.145, "right": 0.97, "top": 0.91}
+BACKGROUND_COLOR = "#0d1523"
+
+
+def _describe_shape(skewness: float) -> str:
     if abs(skewness) < 0.1:
         return "Simetrica"
     if skewness > 0:
@@ -14,97 +26,200 @@ def _describe_shape(data: np.ndarray) -> str:
     return "Sesgo negativo (cola a la izquierda)"
 
 
-def plot_population_hist(population_data: np.ndarray, dist_name: str, dist_params: Dict[str, float]) -> plt.Figure:
-    """Histograma de la poblacion generada con curva suavizada."""
-    fig, ax = plt.subplots(figsize=(6.2, 4.2))
-    fig.patch.set_facecolor("#0d1523")
-    ax.set_facecolor("#0d1523")
-
-    counts, bins, patches = ax.hist(
-        population_data,
-        bins=40,
-        color="#6da7ff",
-        edgecolor="#dbe9ff",
-        alpha=0.8,
-        density=True,
-        label="Poblacion",
-    )
-
-    # Suavizado con KDE para dar una lectura mas estetica.
-    kde = gaussian_kde(population_data)
-    xs = np.linspace(min(population_data), max(population_data), 300)
-    ax.plot(xs, kde(xs), color="#ffeb3b", linewidth=2.6, label="Suavizado KDE")
-
-    # Linea de la media poblacional empirica
-    mean_val = np.mean(population_data)
-    ax.axvline(mean_val, color="#ff7043", linestyle="--", linewidth=2.2, label="Media empirica")
-
-    ax.set_title(
-        f"Distribucion Poblacional - {dist_name}",
-        loc="left",
-        fontsize=12,
-        fontweight="bold",
-        color="#e8eef7",
-    )
-    ax.set_xlabel("Valor", color="#d9e5ff")
-    ax.set_ylabel("Densidad", color="#d9e5ff")
-    ax.tick_params(colors="#c7d5f5")
-
-    shape_text = _describe_shape(population_data)
-    ax.text(
-        0.98,
-        0.92,
-        shape_text,
-        ha="right",
-        va="top",
-        transform=ax.transAxes,
-        bbox=dict(boxstyle="round,pad=0.3", facecolor="#1c2a3f", edgecolor="#324665"),
-        color="#e8eef7",
+def _draw_histogram(ax, summary: DistributionSummary, **hist_kwargs):
+    """
+    Dibuja el histograma precalculado: un dato por bin (su centro) con peso igual a su conteo.
+    Produce las mismas barras y leyenda que ax.hist sobre los datos crudos, pero con costo O(bins).
+    """
+    histogram = summary.histogram
+    _, _, patches = ax.hist(
+        histogram.centers, bins=histogram.edges, weights=histogram.counts, density=True, **hist_kwargs
     )
-    ax.grid(alpha=0.18, linestyle="--", color="#4b6584")
-    ax.legend(frameon=False, loc="upper left", labelcolor="#e8eef7")
-    fig.tight_layout(pad=1.2)
-    return fig
+    return list(patches)
+
+
+class _HistogramFigure:
+    """
+    Figura reutilizable: el tema, los ejes, la leyenda y el layout se configuran una sola vez al crearla, y
+    cada render() solo actualiza los artistas que dependen de los datos (barras, curvas, lineas de media).
+    Se usa matplotlib.figure.Figure sin pyplot, asi la figura no queda registrada en el estado global y
+    no hay que cerrarla. No es segura entre hilos: quien la comparta debe serializar render() y savefig.
+    """
+
+    def __init__(self, bar_style: Dict[str, object], title: str, xlabel: str) -> None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=FIGURE_SIZE)
+        FigureCanvasAgg(self.figure)
+        self.figure.patch.set_facecolor(BACKGROUND_COLOR)
+        # Margenes fijos (los que da tight_layout(pad=1.2) con este tamano) en lugar de tight_layout por llamada.
+        self.figure.subplots_adjust(**FIGURE_MARGINS)
+        ax = self.figure.add_subplot()
+        ax.set_facecolor(BACKGROUND_COLOR)
+        self.ax = ax
+        # Las barras se crean en el primer render, despues que las curvas; zorder < 1 las mantiene por debajo.
+        self._bar_style = dict(bar_style, zorder=0.9)
+        self._bars: List = []
+        # Artistas (ademas de las barras) que van en la leyenda, en orden; los completa cada subclase.
+        self._legend_handles: List = []
+        self._title = ax.set_title(title, loc="left", fontsize=12, fontweight="bold", color="#e8eef7")
+        ax.set_xlabel(xlabel, color="#d9e5ff")
+        ax.set_ylabel("Densidad", color="#d9e5ff")
+        ax.tick_params(colors="#c7d5f5")
+        ax.grid(alpha=0.18, linestyle="--", color="#4b6584")
+
+    def _add_legend(self) -> None:
+        handles = [self._bars[0], *self._legend_handles]
+        self.ax.legend(handles=handles, frameon=False, loc="upper left", labelcolor="#e8eef7")
+
+    def _update_bars(self, summary: DistributionSummary) -> float:
+        """Ajusta las barras al histograma (se recrean solo si cambia la cantidad de bins); devuelve la altura maxima."""
+        histogram = summary.histogram
+        heights = histogram.density()
+        if len(self._bars) != histogram.bins:
+            for bar in self._bars:
+                bar.remove()
+            self._bars = _draw_histogram(self.ax, summary, **self._bar_style)
+            self._add_legend()
+            return float(heights.max(initial=0.0))
+        for bar, left, height in zip(self._bars, histogram.edges[:-1], heights):
+            bar.set_x(left)
+            bar.set_width(histogram.width)
+            bar.set_height(height)
+        return float(heights.max(initial=0.0))
+
+    def _set_limits(self, lo: float, hi: float, top: float) -> None:
+        """Mismos limites que daria el autoescalado (margen de 5%, eje y desde 0) sin recalcular dataLim."""
+        margin = 0.05 * (hi - lo) if hi > lo else 0.5
+        self.ax.set_xlim(lo - margin, hi + margin)
+        self.ax.set_ylim(0.0, 1.05 * top if top > 0 else 1.0)
+
+
+class PopulationFigure(_HistogramFigure):
+    """Histograma de la poblacion con curva KDE, media empirica y descripcion de la forma."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            {"color": "#6da7ff", "edgecolor": "#dbe9ff", "alpha": 0.8, "label": "Poblacion"},
+            "Distribucion Poblacional",
+            "Valor",
+        )
+        ax = self.ax
+        (self._kde_line,) = ax.plot([], [], color="#ffeb3b", linewidth=2.6, label="Suavizado KDE")
+        self._mean_line = ax.axvline(0.0, color="#ff7043", linestyle="--", linewidth=2.2, label="Media empirica")
+        self._median_line = ax.axvline(0.0, color="#c792ea", linestyle=":", linewidth=2.0, label="Mediana")
+        self._shape_text = ax.text(
+            0.98,
+            0.92,
+            "",
+            ha="right",
+            va="top",
+            transform=ax.transAxes,
+            bbox=dict(boxstyle="round,pad=0.3", facecolor="#1c2a3f", edgecolor="#324665"),
+            color="#e8eef7",
+        )
+        self._legend_handles = [self._kde_line, self._mean_line, self._median_line]
+
+    def render(self, summary: DistributionSummary, dist_name: str) -> "Figure":
+        top = self._update_bars(summary)
+        # Suavizado con KDE para dar una lectura mas estetica (desde el histograma fino, sin tocar los datos).
+        xs = np.linspace(summary.min, summary.max, 300)
+        with profile_stage("kde"):
+            density = summary.kde(xs)
+        self._kde_line.set_data(xs, density)
+        mean_val = summary.moments.mean
+        self._mean_line.set_xdata([mean_val, mean_val])
+        # Percentiles desde el sketch del resumen, sin volver a los datos crudos.
+        p05, median, p95 = summary.sketch.quantiles([0.05, 0.5, 0.95])
+        self._median_line.set_xdata([median, median])
+        self._shape_text.set_text(f"{_describe_shape(summary.moments.skewness)}\nP5 = {p05:.3g}   P95 = {p95:.3g}")
+        self._title.set_text(f"Distribucion Poblacional - {dist_name}")
+        edges = summary.histogram.edges
+        self._set_limits(float(edges[0]), float(edges[-1]), max(top, float(density.max(initial=0.0))))
+        return self.figure
+
+
+class SampleMeansFigure(_HistogramFigure):
+    """Histograma de las medias muestrales con la normal teorica del TCL y ambas medias."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            {"color": "#6ad59a", "edgecolor": "#e5ffe5", "alpha": 0.85, "label": "Medias muestrales"},
+            "Distribucion de las medias muestrales",
+            "Media de la muestra",
+        )
+        ax = self.ax
+        self._normal_fill = ax.fill_between([0.0, 1.0], [0.0, 0.0], color="#ffb74d", alpha=0.35, label="Normal teorica")
+        (self._normal_line,) = ax.plot([], [], color="#ff9100", linewidth=2.6)
+        self._empirical_line = ax.axvline(0.0, color="#63a4ff", linestyle="--", linewidth=2.2, label="Media empirica")
+        self._theoretical_line = ax.axvline(0.0, color="#ff9100", linestyle=":", linewidth=2.2, label="Media teorica")
+        from matplotlib.patches import Rectangle
+
+        # Franja vertical (x en datos, y en ejes) con el 95% central de las medias segun el sketch de cuantiles.
+        self._band = ax.add_patch(
+            Rectangle(
+                (0.0, 0.0),
+                0.0,
+                1.0,
+                transform=ax.get_xaxis_transform(),
+                color="#c7d5f5",
+                alpha=0.08,
+                zorder=0.5,
+                label="95% central empirico",
+            )
+        )
+        self._legend_handles = [self._normal_fill, self._empirical_line, self._theoretical_line, self._band]
+
+    def render(self, summary: DistributionSummary, theoretical_mean: float, theoretical_se: float) -> "Figure":
+        top = self._update_bars(summary)
+        xs = np.linspace(summary.min, summary.max, 300)
+        # Densidad normal escrita a mano para no cargar scipy solo por norm.pdf.
+        ys = np.exp(-0.5 * ((xs - theoretical_mean) / theoretical_se) ** 2) / (theoretical_se * np.sqrt(2 * np.pi))
+        self._normal_fill.set_verts([np.column_stack([np.r_[xs, xs[::-1]], np.r_[ys, np.zeros_like(ys)]])])
+        self._normal_line.set_data(xs, ys)
+        emp_mean = summary.moments.mean
+        self._empirical_line.set_xdata([emp_mean, emp_mean])
+        self._theoretical_line.set_xdata([theoretical_mean, theoretical_mean])
+        low, high = summary.sketch.quantiles([0.025, 0.975])
+        self._band.set_x(low)
+        self._band.set_width(high - low)
+        edges = summary.histogram.edges
+        self._set_limits(
+            min(float(edges[0]), theoretical_mean),
+            max(float(edges[-1]), theoretical_mean),
+            max(top, float(ys.max(initial=0.0))),
+        )
+        return self.figure
+
+
+def plot_population_hist(
+    population_data: Optional[np.ndarray],
+    dist_name: str,
+    dist_params: Dict[str, float],
+    summary: Optional[DistributionSummary] = None,
+) -> "Figure":
+    """
+    Histograma de la poblacion generada con curva suavizada, en una figura nueva.
+    Si se pasa summary (histograma y momentos precalculados) no se recorren los datos crudos.
+    Para redibujar muchas veces conviene reutilizar un PopulationFigure.
+    """
+    if summary is None:
+        summary = summarize_array(population_data, POPULATION_BINS)
+    return PopulationFigure().render(summary, dist_name)
 
 
 def plot_sample_means_hist(
-    sample_means: np.ndarray, theoretical_mean: float, theoretical_se: float
-) -> plt.Figure:
-    """Histograma de medias muestrales con curva normal teorica superpuesta."""
-    fig, ax = plt.subplots(figsize=(6.2, 4.2))
-    fig.patch.set_facecolor("#0d1523")
-    ax.set_facecolor("#0d1523")
-
-    counts, bins, _ = ax.hist(
-        sample_means,
-        bins=30,
-        color="#6ad59a",
-        edgecolor="#e5ffe5",
-        alpha=0.85,
-        density=True,
-        label="Medias muestrales",
-    )
-
-    xs = np.linspace(min(sample_means), max(sample_means), 300)
-    ys = norm.pdf(xs, loc=theoretical_mean, scale=theoretical_se)
-    ax.fill_between(xs, ys, color="#ffb74d", alpha=0.35, label="Normal teorica")
-    ax.plot(xs, ys, color="#ff9100", linewidth=2.6)
-
-    emp_mean = np.mean(sample_means)
-    ax.axvline(emp_mean, color="#63a4ff", linestyle="--", linewidth=2.2, label="Media empirica")
-    ax.axvline(theoretical_mean, color="#ff9100", linestyle=":", linewidth=2.2, label="Media teorica")
-
-    ax.set_title(
-        "Distribucion de las medias muestrales",
-        loc="left",
-        fontsize=12,
-        fontweight="bold",
-        color="#e8eef7",
-    )
-    ax.set_xlabel("Media de la muestra", color="#d9e5ff")
-    ax.set_ylabel("Densidad", color="#d9e5ff")
-    ax.tick_params(colors="#c7d5f5")
-    ax.grid(alpha=0.18, linestyle="--", color="#4b6584")
-    ax.legend(frameon=False, loc="upper left", labelcolor="#e8eef7")
-    fig.tight_layout(pad=1.2)
-    return fig
+    sample_means: Optional[np.ndarray],
+    theoretical_mean: float,
+    theoretical_se: float,
+    summary: Optional[DistributionSummary] = None,
+) -> "Figure":
+    """
+    Histograma de medias muestrales con curva normal teorica superpuesta, en una figura nueva.
+    Si se pasa summary (histograma y momentos precalculados) no se recorren los datos crudos.
+    Para redibujar muchas veces conviene reutilizar un SampleMeansFigure.
+    """
+    if summary is None:
+        summary = summarize_array(sample_means, SAMPLE_MEANS_BINS)
+    return SampleMeansFigure().render(summary, theoretical_mean, theoretical_se)
@@ -1,7 +1,14 @@
-from typing import Dict, Tuple
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import streamlit as st
 
+from core.distributions import DistributionSpec, available_distributions, get_distribution
+
+POPULATION_SIZE_OPTIONS = [
+    5_000, 10_000, 20_000, 50_000, 100_000, 200_000, 500_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000, 20_000_000
+]
+
 
 def render_header() -> None:
     st.title("Visualizador Interactivo del Teorema Central del Limite")
@@ -12,31 +19,26 @@ def render_header() -> None:
     )
 
 
-def _uniform_controls(container) -> Dict[str, float]:
-    container.subheader("Parametros Uniforme")
-    a = container.slider("Limite inferior (a)", -10.0, 10.0, 0.0, step=0.5, help="Valor minimo de la distribucion.")
-    b = container.slider(
-        "Limite superior (b)",
-        a + 0.5,
-        20.0,
-        max(a + 1.0, 5.0),
-        step=0.5,
-        help="Debe ser mayor que a; controla la amplitud.",
-    )
-    return {"a": float(a), "b": float(b)}
-
-
-def _exponential_controls(container) -> Dict[str, float]:
-    container.subheader("Parametros Exponencial")
-    lam = container.slider("Tasa (lambda)", 0.1, 5.0, 1.0, step=0.1, help="Mayor lambda implica colas mas cortas.")
-    return {"lam": float(lam)}
-
-
-def _binomial_controls(container) -> Dict[str, float]:
-    container.subheader("Parametros Binomial")
-    n_trials = container.slider("Numero de ensayos (n)", 1, 60, 20, step=1, help="Cantidad de ensayos por prueba.")
-    p = container.slider("Probabilidad de exito (p)", 0.01, 0.99, 0.5, step=0.01, help="Probabilidad en cada ensayo.")
-    return {"n_trials": int(n_trials), "p": float(p)}
+def _param_controls(container, spec: DistributionSpec) -> Dict[str, float]:
+    """Un slider por parametro de la distribucion, segun su ParamSpec en el registro."""
+    container.subheader(f"Parametros {spec.name}")
+    values: Dict[str, float] = {}
+    for param in spec.params:
+        min_value, default = param.min_value, param.default
+        if param.greater_than is not None:
+            min_value = values[param.greater_than] + param.step
+            default = max(min_value + param.step, default)
+        cast = int if param.integer else float
+        value = container.slider(
+            param.label,
+            cast(min_value),
+            cast(param.max_value),
+            cast(default),
+            step=cast(param.step),
+            help=param.help or None,
+        )
+        values[param.name] = cast(value)
+    return values
 
 
 def render_controls(container=None) -> Tuple[str, Dict[str, float], int, int, int]:
@@ -45,16 +47,10 @@ def render_controls(container=None) -> Tuple[str, Dict[str, float], int, int, in
 
     dist_name = target.selectbox(
         "Distribucion poblacional",
-        ["Uniforme", "Exponencial", "Binomial"],
+        available_distributions(),
         help="Elige la forma base de la poblacion.",
     )
-
-    if dist_name == "Uniforme":
-        dist_params = _uniform_controls(target)
-    elif dist_name == "Exponencial":
-        dist_params = _exponential_controls(target)
-    else:
-        dist_params = _binomial_controls(target)
+    dist_params = _param_controls(target, get_distribution(dist_name))
 
     sample_size = target.slider(
         "Tamano de la muestra (n)",
@@ -67,17 +63,146 @@ def render_controls(container=None) -> Tuple[str, Dict[str, float], int, int, in
     n_simulations = target.slider(
         "Numero de simulaciones (k)",
         100,
-        5000,
+        100_000,
         1000,
         step=100,
-        help="Cuantas medias muestrales se generan para el histograma.",
+        help="Cuantas medias muestrales se generan para el histograma; con k grande se muestran resultados parciales.",
     )
-    population_size = target.slider(
+    population_size = target.select_slider(
         "Tamano de poblacion para graficar",
-        5000,
-        200000,
-        100000,
-        step=5000,
-        help="Cantidad de datos sinteticos para visualizar la distribucion original.",
+        POPULATION_SIZE_OPTIONS,
+        value=100_000,
+        format_func=lambda size: f"{size:,}",
+        help=(
+            "Cantidad de datos sinteticos para visualizar la distribucion original. Por encima de 200,000 "
+            "el grafico sale de una muestra estratificada y los momentos se calculan sin guardar los datos."
+        ),
     )
     return dist_name, dist_params, sample_size, n_simulations, population_size
+
+
+def render_advanced_controls(container=None) -> Dict[str, Any]:
+    """Opciones de ejecucion (semilla, rendimiento) agrupadas en un expander plegado."""
+    target = container if container is not None else st.sidebar
+    expander = target.expander("Opciones avanzadas", expanded=False)
+    seed = expander.number_input(
+        "Semilla aleatoria",
+        min_value=0,
+        max_value=2**32 - 1,
+        value=42,
+        step=1,
+        help="La misma semilla reproduce exactamente la poblacion y las medias muestrales.",
+    )
+    max_workers = os.cpu_count() or 1
+    n_workers = 1
+    if max_workers > 1:
+        n_workers = expander.slider(
+            "Hilos de simulacion",
+            1,
+            max_workers,
+            min(4, max_workers),
+            step=1,
+            help="Reparte las simulaciones entre nucleos; el resultado no cambia con este valor.",
+        )
+    profile = expander.checkbox(
+        "Mostrar panel de rendimiento",
+        value=False,
+        help="Mide tiempo, memoria y uso de cache de cada etapa del recalculo.",
+    )
+    return {"seed": int(seed), "n_workers": int(n_workers), "profile": bool(profile)}
+
+
+def render_normality_diagnostics(diagnostics: Dict[str, float]) -> None:
+    """Metricas de normalidad de las medias muestrales frente a la normal teorica del TCL."""
+    st.markdown("**Diagnosticos de normalidad de las medias**")
+    ks_col, ad_col, shape_col, be_col = st.columns(4)
+    with ks_col:
+        st.metric(
+            "Distancia KS",
+            f"{diagnostics['ks']:.4f}",
+            help=(
+                "Mayor distancia entre la distribucion empirica de las medias y la normal teorica "
+                f"(a lo sumo {diagnostics['ks_upper']:.4f} por la resolucion del histograma). "
+                f"Por debajo de {diagnostics['ks_critical']:.4f} es compatible con la normal al 5%."
+            ),
+        )
+    with ad_col:
+        st.metric(
+            "Anderson-Darling",
+            f"{diagnostics['anderson_darling']:.3f}",
+            help="Como KS pero con mas peso en las colas; por debajo de 2.492 es compatible con la normal al 5%.",
+        )
+    with shape_col:
+        st.metric("Asimetria", f"{diagnostics['skewness']:.4f}", help="0 para la normal.")
+        st.metric("Curtosis (exceso)", f"{diagnostics['kurtosis']:.4f}", help="0 para la normal.")
+    with be_col:
+        st.metric(
+            "Cota de Berry-Esseen",
+            f"{diagnostics['berry_esseen']:.4f}",
+            help="Distancia KS maxima posible entre la distribucion exacta de la media y la normal para este n.",
+        )
+
+
+def render_convergence_panel(load_rows: Callable[[], List[Dict[str, float]]]) -> None:
+    """
+    Expander "Estudio de convergencia": medias para varios n obtenidas de una sola simulacion.
+    load_rows solo se llama si el usuario activa el estudio, para no pagar su costo en cada rerun.
+    """
+    with st.expander("Estudio de convergencia", expanded=False):
+        st.caption(
+            "Simula una vez muestras del n mas grande y toma las medias de cada prefijo: "
+            "al crecer n, la desviacion se acerca al error estandar y la distancia KS a la normal cae."
+        )
+        if not st.checkbox("Calcular para varios n", value=False):
+            return
+        rows = load_rows()
+        table = [
+            {
+                "n": row["n"],
+                "Desv. empirica": round(row["std"], 5),
+                "Error estandar": round(row["se"], 5),
+                "Desv. / EE": round(row["std_ratio"], 4),
+                "Asimetria": round(row["skewness"], 4),
+                "Curtosis (exceso)": round(row["kurtosis"], 4),
+                "Distancia KS": round(row["ks"], 4),
+            }
+            for row in rows
+        ]
+        st.dataframe(table, use_container_width=True, hide_index=True)
+        st.line_chart({"n": [row["n"] for row in rows], "Distancia KS": [row["ks"] for row in rows]}, x="n")
+
+
+def render_performance_panel(profiler, cache_stats: Optional[Dict[str, int]] = None) -> None:
+    """
+    Panel "Rendimiento" con las etapas medidas en este rerun y su exportacion a JSON.
+    cache_stats (ver utils.pipeline.cache_stats) agrega el estado del cache compartido entre sesiones.
+    """
+    with st.expander("Rendimiento", expanded=True):
+        rows = [
+            {
+                "Etapa": record["stage"],
+                "Tiempo (ms)": round(record["seconds"] * 1000, 2),
+                "Memoria asignada (KB)": round((record["alloc_bytes"] or 0) / 1024, 1),
+                "Pico (KB)": round((record["peak_bytes"] or 0) / 1024, 1),
+                "Cache": record["cache"] or "-",
+            }
+            for record in profiler.records
+        ]
+        if rows:
+            st.dataframe(rows, use_container_width=True, hide_index=True)
+            st.caption("Las etapas anidadas (p. ej. kde dentro de figura.poblacion) tambien suman en la etapa externa.")
+        else:
+            st.caption("No se registraron etapas en este rerun.")
+        if cache_stats is not None:
+            st.caption(
+                f"Cache compartido: {cache_stats['entries']} entradas, "
+                f"{cache_stats['nbytes'] / 2**20:.1f} de {cache_stats['max_bytes'] / 2**20:.0f} MB; "
+                f"{cache_stats['hits']} aciertos, {cache_stats['misses']} calculos, "
+                f"{cache_stats['shared']} pedidos que esperaron un calculo en curso."
+            )
+        st.download_button(
+            "Exportar perfil (JSON)",
+            data=profiler.to_json(),
+            file_name="perfil_tcl.json",
+            mime="application/json",
+        )
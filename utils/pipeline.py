@@ -0,0 +1,425 @@
+"""
+Etapas de la app (poblacion, medias, resumenes/metricas, figuras y PDF) detras de caches LRU.
+Las claves solo incluyen las entradas que afectan a cada etapa: cambiar population_size no recalcula
+las medias muestrales y cambiar n_simulations no regenera la poblacion. Las poblaciones grandes no se
+materializan: solo se guarda su resumen (ver get_population_summary). Volver a un valor previo
+de un control devuelve el resultado cacheado.
+Las medias se guardan como IncrementalSampleMeans por (distribucion, parametros, n, semilla): subir k
+solo genera las medias faltantes y bajarlo devuelve un prefijo. start_sample_means las genera en segundo
+plano por pasos, para mostrar resultados parciales mientras avanza la corrida.
+Los caches viven a nivel de modulo para sobrevivir a los reruns de Streamlit.
+El cache es uno solo por proceso y lo comparten todas las sesiones: las configuraciones repetidas se calculan
+una vez, los pedidos simultaneos de una misma clave esperan al primero (single-flight) y la memoria total
+queda acotada por DATA_CACHE_BYTES sin importar cuantos usuarios haya.
+Si se configura un ResultStore (variable de entorno TCL_STORE_DIR o configure_store) la poblacion y las
+medias tambien se persisten en disco y se recargan mapeadas en memoria entre reinicios del proceso; los
+resumenes, diagnosticos y PNG se guardan junto a ellas, asi varios procesos del servidor comparten resultados.
+El PDF solo se genera cuando se solicita (request_pdf_report), en un hilo de fondo, a partir de los PNG
+ya cacheados de cada figura; el resultado queda cacheado por las entradas de la simulacion.
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from core.cache import LRUCache, make_key
+from core.convergence import simulate_convergence
+from core.histogram import DistributionSummary, summarize_array
+from core.metrics import compute_normality_diagnostics
+from core.profiling import profile_stage, record_cache
+from core.rng import spawn_seeds
+from core.simulation import (
+    POPULATION_DISPLAY_SIZE,
+    BackgroundSimulation,
+    IncrementalSampleMeans,
+    generate_population,
+    summarize_population,
+)
+from core.store import ResultStore
+from core.visualization import POPULATION_BINS, SAMPLE_MEANS_BINS, PopulationFigure, SampleMeansFigure
+from utils.report import figure_to_png
+
+# Presupuesto de memoria del cache compartido por todas las sesiones del proceso (TCL_CACHE_MB lo ajusta).
+DATA_CACHE_BYTES = int(os.environ.get("TCL_CACHE_MB", "512")) * 1024 * 1024
+REPORT_WORKERS = 2
+SIMULATION_WORKERS = 2
+
+
+_data_cache = LRUCache(DATA_CACHE_BYTES)
+
+
+_store: Optional[ResultStore] = ResultStore(os.environ["TCL_STORE_DIR"]) if os.environ.get("TCL_STORE_DIR") else None
+
+
+def configure_store(root: Optional[str]) -> None:
+    """Activa (o desactiva con None) la persistencia en disco de poblaciones y medias."""
+    global _store
+    _store = ResultStore(root) if root else None
+
+
+def _stored(key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+    """Lee el arreglo del almacen en disco si existe; si no, lo calcula y lo guarda."""
+    if _store is None:
+        return compute()
+    stored = _store.read(key)
+    if stored is not None:
+        return stored
+    return _store.write_array(key, compute())
+
+
+def _stored_object(key: Hashable, compute: Callable[[], Any]) -> Any:
+    """Como _stored, para resultados que no son arreglos (resumenes, diagnosticos, PNG)."""
+    if _store is None:
+        return compute()
+    stored = _store.read_object(key)
+    if stored is not None:
+        return stored
+    return _store.write_object(key, compute())
+
+
+def _cached(cache: LRUCache, stage: str, key: Hashable, compute: Callable[[], Any], persist: bool = False) -> Any:
+    """
+    get_or_compute con registro de la etapa (duracion/memoria en fallos, acierto de cache si no).
+    Las sesiones que piden la misma clave mientras se calcula esperan ese calculo (single-flight) y cuentan
+    como acierto. Con persist=True y un ResultStore configurado, el resultado tambien se lee o se guarda en
+    disco, asi lo comparten otros procesos y sobrevive a reinicios.
+    """
+    computed = False
+
+    def run() -> Any:
+        nonlocal computed
+        computed = True
+        with profile_stage(stage, cache="miss"):
+            return _stored_object(key, compute) if persist else compute()
+
+    value = cache.get_or_compute(key, run)
+    if not computed:
+        record_cache(stage, hit=True)
+    return value
+
+
+def cache_stats() -> Dict[str, int]:
+    """Uso del cache compartido: entradas, bytes, aciertos, fallos y pedidos que esperaron un calculo en curso."""
+    return _data_cache.stats()
+
+
+def _stream_seeds(seed: int):
+    """Flujos independientes para la poblacion y las medias, derivados de una sola semilla."""
+    return spawn_seeds(seed, 2)
+
+
+def population_key(dist_name: str, dist_params: Dict[str, float], size: int, seed: int) -> Hashable:
+    return make_key("population", dist_name, dist_params, size, seed)
+
+
+def means_key(
+    dist_name: str, dist_params: Dict[str, float], sample_size: int, n_simulations: int, seed: int
+) -> Hashable:
+    # n_workers no forma parte de la clave: el backend paralelo da el mismo resultado con cualquier valor.
+    return make_key("sample_means", dist_name, dist_params, sample_size, n_simulations, seed)
+
+
+def get_population(dist_name: str, dist_params: Dict[str, float], size: int, seed: int) -> np.ndarray:
+    population_seed, _ = _stream_seeds(seed)
+    key = population_key(dist_name, dist_params, size, seed)
+    return _cached(
+        _data_cache,
+        "poblacion",
+        key,
+        lambda: _stored(key, lambda: generate_population(dist_name, dist_params, size, rng=population_seed)),
+    )
+
+
+def get_sample_means(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    sample_size: int,
+    n_simulations: int,
+    seed: int,
+    n_workers: int = 1,
+) -> np.ndarray:
+    _, means_seed = _stream_seeds(seed)
+    key = means_key(dist_name, dist_params, sample_size, n_simulations, seed)
+    stream_key = make_key("sample_means_stream", dist_name, dist_params, sample_size, seed)
+    simulation = _data_cache.get(stream_key)
+    if simulation is None:
+        # Sin simulacion incremental en memoria, el almacen en disco evita recalcular este k exacto.
+        stored = _store.read(key) if _store is not None else None
+        if stored is not None:
+            record_cache("medias_muestrales", hit=True)
+            return stored
+        # get_or_compute: las sesiones concurrentes comparten la misma simulacion, cuyo lock evita generar dos veces.
+        simulation = _data_cache.get_or_compute(
+            stream_key, lambda: IncrementalSampleMeans(dist_name, dist_params, sample_size, seed=means_seed)
+        )
+    if simulation.n_computed >= n_simulations:
+        record_cache("medias_muestrales", hit=True)
+        sample_means = simulation.get(n_simulations)
+    else:
+        with profile_stage("medias_muestrales", cache="miss"):
+            sample_means = simulation.get(n_simulations, n_workers)
+    # Se vuelve a guardar para actualizar el tamano contabilizado tras extender el arreglo.
+    _data_cache.put(stream_key, simulation)
+    if _store is not None and key not in _store:
+        _store.write_array(key, sample_means)
+    return sample_means
+
+
+# Corridas de medias en segundo plano (start_sample_means). Con pocos hilos, las corridas canceladas por
+# cambios rapidos de los controles no se acumulan: cada una termina en cuanto acaba su paso en curso.
+_simulation_executor = ThreadPoolExecutor(max_workers=SIMULATION_WORKERS, thread_name_prefix="tcl-sim")
+
+
+def start_sample_means(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    sample_size: int,
+    n_simulations: int,
+    seed: int,
+    n_workers: int = 1,
+) -> Optional[BackgroundSimulation]:
+    """
+    Lanza en segundo plano la generacion de las medias que falten para estas entradas y devuelve la corrida,
+    o None si ya estan disponibles (resumen cacheado, simulacion incremental con k suficiente o almacen en disco)
+    y alcanza con get_means_summary. Quien la lanza debe cancelarla si sus entradas cambian.
+    Al terminar, get_sample_means y get_means_summary encuentran las medias en la simulacion incremental cacheada.
+    """
+    key = means_key(dist_name, dist_params, sample_size, n_simulations, seed)
+    summary_key = make_key("summary", key)
+    if summary_key in _data_cache or (_store is not None and (key in _store or _store.has_object(summary_key))):
+        return None
+    stream_key = make_key("sample_means_stream", dist_name, dist_params, sample_size, seed)
+    _, means_seed = _stream_seeds(seed)
+    simulation = _data_cache.get_or_compute(
+        stream_key, lambda: IncrementalSampleMeans(dist_name, dist_params, sample_size, seed=means_seed)
+    )
+    if simulation.n_computed >= n_simulations:
+        return None
+    # Como en get_sample_means, la simulacion se vuelve a guardar tras cada paso para que el cache contabilice
+    # su tamano actual (y la expulse si ya no entra en el presupuesto).
+    run = BackgroundSimulation(
+        simulation, n_simulations, n_workers, on_step=lambda extended: _data_cache.put(stream_key, extended)
+    )
+    return run.start(_simulation_executor)
+
+
+def get_means_snapshot(run: BackgroundSimulation) -> Optional[DistributionSummary]:
+    """Resumen de las medias generadas hasta ahora por una corrida en segundo plano (sin cache)."""
+    return run.snapshot(SAMPLE_MEANS_BINS)
+
+
+def get_convergence(
+    dist_name: str, dist_params: Dict[str, float], n_simulations: int, seed: int
+) -> List[Dict[str, float]]:
+    """Resumen por n del estudio de convergencia (ver core.convergence), con su propio flujo aleatorio."""
+    # Tercer flujo derivado de la semilla: no altera los de poblacion y medias.
+    convergence_seed = spawn_seeds(seed, 1, start=2)[0]
+    return _cached(
+        _data_cache,
+        "convergencia",
+        make_key("convergence", dist_name, dist_params, n_simulations, seed),
+        lambda: simulate_convergence(dist_name, dist_params, n_simulations=n_simulations, rng=convergence_seed),
+        persist=True,
+    )
+
+
+def get_population_summary(
+    dist_name: str, dist_params: Dict[str, float], size: int, seed: int
+) -> DistributionSummary:
+    """
+    Histograma y momentos de la poblacion, calculados en una pasada y cacheados junto a ella.
+    Por encima de POPULATION_DISPLAY_SIZE la poblacion no se materializa ni se guarda: los momentos se calculan
+    en streaming y el grafico sale de una muestra estratificada (ver core.simulation.summarize_population).
+    """
+
+    def compute() -> DistributionSummary:
+        if size <= POPULATION_DISPLAY_SIZE:
+            return summarize_array(get_population(dist_name, dist_params, size, seed), POPULATION_BINS)
+        population_seed, _ = _stream_seeds(seed)
+        return summarize_population(dist_name, dist_params, size, POPULATION_BINS, rng=population_seed)
+
+    return _cached(
+        _data_cache,
+        "resumen.poblacion",
+        make_key("summary", population_key(dist_name, dist_params, size, seed)),
+        compute,
+        persist=True,
+    )
+
+
+def get_means_summary(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    sample_size: int,
+    n_simulations: int,
+    seed: int,
+    n_workers: int = 1,
+) -> DistributionSummary:
+    """Histograma y momentos de las medias muestrales, cacheados junto a ellas."""
+    return _cached(
+        _data_cache,
+        "resumen.medias",
+        make_key("summary", means_key(dist_name, dist_params, sample_size, n_simulations, seed)),
+        lambda: summarize_array(
+            get_sample_means(dist_name, dist_params, sample_size, n_simulations, seed, n_workers),
+            SAMPLE_MEANS_BINS,
+        ),
+        persist=True,
+    )
+
+
+def get_means_diagnostics(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    sample_size: int,
+    n_simulations: int,
+    seed: int,
+    n_workers: int = 1,
+) -> Dict[str, float]:
+    """Diagnosticos de normalidad de las medias (KS, Anderson-Darling, Berry-Esseen) desde su histograma fino."""
+
+    def compute() -> Dict[str, float]:
+        summary = get_means_summary(dist_name, dist_params, sample_size, n_simulations, seed, n_workers)
+        fine = summary.fine
+        return compute_normality_diagnostics(
+            dist_name, dist_params, sample_size, summary.moments, fine.edges, fine.counts, fine.underflow, fine.overflow
+        )
+
+    return _cached(
+        _data_cache,
+        "diagnosticos",
+        make_key("diagnostics", means_key(dist_name, dist_params, sample_size, n_simulations, seed)),
+        compute,
+        persist=True,
+    )
+
+
+# Una figura por tipo, creada al primer uso y reutilizada por todas las sesiones: cada grafico nuevo solo
+# actualiza los datos de sus artistas. El lock serializa render y rasterizado sobre la figura compartida.
+_renderers: Dict[str, Any] = {}
+_render_lock = threading.Lock()
+
+
+def _render_png(kind: str, factory: Callable[[], Any], draw: Callable[[Any], Any]) -> bytes:
+    with _render_lock:
+        renderer = _renderers.get(kind)
+        if renderer is None:
+            renderer = _renderers[kind] = factory()
+        with profile_stage(f"figura.{kind}"):
+            figure = draw(renderer)
+        return figure_to_png(figure)
+
+
+def get_population_png(dist_name: str, dist_params: Dict[str, float], size: int, seed: int) -> bytes:
+    """PNG de la figura de poblacion; se rasteriza una sola vez y lo comparten la vista y el PDF."""
+
+    def compute() -> bytes:
+        summary = get_population_summary(dist_name, dist_params, size, seed)
+        return _render_png("poblacion", PopulationFigure, lambda renderer: renderer.render(summary, dist_name))
+
+    return _cached(
+        _data_cache,
+        "png.poblacion",
+        make_key("png", population_key(dist_name, dist_params, size, seed)),
+        compute,
+        persist=True,
+    )
+
+
+def get_means_png(
+    dist_name: str,
+    dist_params: Dict[str, float],
+    sample_size: int,
+    n_simulations: int,
+    seed: int,
+    theoretical: Dict[str, float],
+    n_workers: int = 1,
+) -> bytes:
+    """PNG de la figura de medias muestrales, cacheado como get_population_png."""
+
+    def compute() -> bytes:
+        summary = get_means_summary(dist_name, dist_params, sample_size, n_simulations, seed, n_workers)
+        return _render_png(
+            "medias",
+            SampleMeansFigure,
+            lambda renderer: renderer.render(summary, theoretical["mean"], theoretical["se"]),
+        )
+
+    return _cached(
+        _data_cache,
+        "png.medias",
+        make_key("png", means_key(dist_name, dist_params, sample_size, n_simulations, seed)),
+        compute,
+        persist=True,
+    )
+
+
+def render_means_snapshot_png(summary: DistributionSummary, theoretical: Dict[str, float]) -> bytes:
+    """PNG de medias parciales; no se cachea porque cada avance de la corrida da un resumen distinto."""
+    return _render_png(
+        "medias", SampleMeansFigure, lambda renderer: renderer.render(summary, theoretical["mean"], theoretical["se"])
+    )
+
+
+def get_pdf_report(inputs: Dict[str, Any], **report_kwargs) -> bytes:
+    """PDF cacheado por las entradas de la simulacion (ver build_pdf_report para report_kwargs)."""
+    from utils.report import build_pdf_report
+
+    return _cached(
+        _data_cache,
+        "pdf",
+        make_key("pdf", inputs),
+        lambda: build_pdf_report(inputs=inputs, **report_kwargs),
+    )
+
+
+# Solo la maquetacion con reportlab corre en segundo plano: recibe PNG ya rasterizados, asi que
+# los hilos de fondo no tocan figuras de matplotlib.
+_report_executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="tcl-pdf")
+_report_jobs: Dict[Hashable, Future] = {}
+_report_lock = threading.Lock()
+
+
+def request_pdf_report(inputs: Dict[str, Any], **report_kwargs) -> None:
+    """
+    Encola la generacion del PDF en segundo plano si no esta cacheado ni en curso.
+    fig_population y fig_means deben ser los PNG de get_population_png/get_means_png.
+    Si la generacion anterior fallo, se vuelve a intentar.
+    """
+    from utils.report import build_pdf_report
+
+    key = make_key("pdf", inputs)
+    with _report_lock:
+        job = _report_jobs.get(key)
+        if key in _data_cache or (job is not None and not (job.done() and job.exception() is not None)):
+            return
+
+        def build() -> bytes:
+            report = build_pdf_report(inputs=inputs, **report_kwargs)
+            _data_cache.put(key, report)
+            # Con el PDF en cache el trabajo ya no hace falta; solo se conservan los fallidos para informar el error.
+            with _report_lock:
+                _report_jobs.pop(key, None)
+            return report
+
+        _report_jobs[key] = _report_executor.submit(build)
+
+
+def get_report_status(inputs: Dict[str, Any]) -> Tuple[str, Any]:
+    """
+    Estado del PDF para estas entradas: ("listo", bytes), ("generando", None), ("error", excepcion)
+    o ("no_solicitado", None).
+    """
+    key = make_key("pdf", inputs)
+    report = _data_cache.get(key)
+    if report is not None:
+        return "listo", report
+    with _report_lock:
+        job = _report_jobs.get(key)
+        if job is None:
+            return "no_solicitado", None
+        if not job.done():
+            return "generando", None
+        return "error", job.exception()
@@ -1,63 +1,104 @@
+import os
+from functools import lru_cache
 from io import BytesIO
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from core.distributions import get_distribution
+from core.profiling import profile_stage
 
+# reportlab se importa dentro de las funciones: solo se carga cuando realmente se genera un PDF.
+# Puntos por pulgada, igual que reportlab.lib.units.inch.
+INCH = 72.0
 
-def _fig_to_image(fig, width: float = 5.8 * inch, height: float = 3.6 * inch) -> Image:
-    """Convierte una figura de matplotlib a un objeto Image de reportlab."""
+
+def figure_to_png(fig) -> bytes:
+    """Rasteriza una figura de matplotlib a PNG con la resolucion usada en el reporte."""
     buffer = BytesIO()
-    fig.savefig(buffer, format="png", bbox_inches="tight", dpi=160)
-    buffer.seek(0)
-    img = Image(buffer, width=width, height=height)
+    with profile_stage("pdf.png"):
+        # Sin bbox_inches="tight": las figuras tienen margenes fijos y el recorte costaria un dibujo extra por PNG.
+        fig.savefig(buffer, format="png", dpi=160)
+    return buffer.getvalue()
+
+
+def _fig_to_image(fig, width: float = 5.8 * INCH, height: float = 3.6 * INCH):
+    """
+    Convierte una figura de matplotlib a un objeto Image de reportlab.
+    Tambien acepta los bytes de un PNG ya rasterizado (p. ej. desde el cache de figuras) y no lo vuelve a generar.
+    """
+    from reportlab.platypus import Image
+
+    png = fig if isinstance(fig, (bytes, bytearray)) else figure_to_png(fig)
+    img = Image(BytesIO(png), width=width, height=height)
     return img
 
 
 def _format_params(dist_name: str, dist_params: Dict[str, Any]) -> str:
-    """Devuelve una linea legible de parametros segun la distribucion."""
-    if dist_name == "Uniforme":
-        return f"a = {dist_params['a']:.2f}, b = {dist_params['b']:.2f}"
-    if dist_name == "Exponencial":
-        return f"lambda = {dist_params['lam']:.2f}"
-    if dist_name == "Binomial":
-        return f"n = {dist_params['n_trials']}, p = {dist_params['p']:.2f}"
-    return ""
+    """Devuelve una linea legible de parametros segun la distribucion (formato definido en su registro)."""
+    return get_distribution(dist_name).format_params(dist_params)
 
 
-def _build_table(data, col_widths=None) -> Table:
-    table = Table(data, colWidths=col_widths)
-    table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#0f1d33")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, -1), 9),
-                ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
-                ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#16263d")),
-                ("TEXTCOLOR", (0, 1), (-1, -1), colors.HexColor("#dfe8f7")),
-                ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#2c4062")),
-                ("GRID", (0, 0), (-1, -1), 0.3, colors.HexColor("#2c4062")),
-            ]
+@lru_cache(maxsize=None)
+def _table_style():
+    """Estilo de tabla compartido por todos los reportes (se construye una vez por proceso)."""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#0f1d33")),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+            ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor("#16263d")),
+            ("TEXTCOLOR", (0, 1), (-1, -1), colors.HexColor("#dfe8f7")),
+            ("BOX", (0, 0), (-1, -1), 0.5, colors.HexColor("#2c4062")),
+            ("GRID", (0, 0), (-1, -1), 0.3, colors.HexColor("#2c4062")),
+        ]
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_styles():
+    """Hoja de estilos del reporte, construida una vez por proceso y compartida (solo lectura) entre reportes."""
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+    styles = getSampleStyleSheet()
+    styles.add(
+        ParagraphStyle(
+            name="Muted",
+            fontSize=9,
+            leading=12,
+            textColor=colors.HexColor("#c7d6f3"),
         )
     )
+    styles["Title"].textColor = colors.HexColor("#e8eef7")
+    styles["Heading2"].textColor = colors.HexColor("#e8eef7")
+    styles["Normal"].textColor = colors.HexColor("#dfe8f7")
+    return styles
+
+
+def _build_table(data, col_widths=None):
+    from reportlab.platypus import Table
+
+    table = Table(data, colWidths=col_widths)
+    table.setStyle(_table_style())
     return table
 
 
-def _draw_background(canvas, doc, hex_color: str) -> None:
+def _draw_background(canvas, doc, hex_color: str = "#0d1523") -> None:
     """Pinta un fondo solido en cada pagina."""
+    from reportlab.lib import colors
+
     canvas.saveState()
     canvas.setFillColor(colors.HexColor(hex_color))
     canvas.rect(0, 0, doc.pagesize[0], doc.pagesize[1], fill=1, stroke=0)
     canvas.restoreState()
 
 
-def build_pdf_report(
+def _report_elements(
     inputs: Dict[str, Any],
     pop_empirical: Dict[str, float],
     sample_empirical: Dict[str, float],
@@ -66,39 +107,17 @@ def build_pdf_report(
     means_diff: Dict[str, float],
     fig_population,
     fig_means,
-) -> bytes:
-    """
-    Crea un PDF con resumen de entradas, metrica teorica/empirica y graficas.
-    Devuelve los bytes listos para descargar en Streamlit.
-    """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=36,
-        leftMargin=36,
-        topMargin=42,
-        bottomMargin=42,
-        title="Reporte TCL",
-    )
-
-    styles = getSampleStyleSheet()
-    styles.add(
-        ParagraphStyle(
-            name="Muted",
-            fontSize=9,
-            leading=12,
-            textColor=colors.HexColor("#c7d6f3"),
-        )
-    )
-    styles["Title"].textColor = colors.HexColor("#e8eef7")
-    styles["Heading2"].textColor = colors.HexColor("#e8eef7")
-    styles["Normal"].textColor = colors.HexColor("#dfe8f7")
+    diagnostics: Optional[Dict[str, float]] = None,
+    title: str = "Reporte del Teorema Central del Limite",
+) -> List[Any]:
+    """Flowables de un reporte (o de una seccion de un PDF combinado)."""
+    from reportlab.platypus import Paragraph, Spacer
 
+    styles = _get_styles()
     elements = []
-    title = Paragraph("Reporte del Teorema Central del Limite", styles["Title"])
-    subtitle = Paragraph("Entradas y resultados de la simulación", styles["Muted"])
-    elements.extend([title, subtitle, Spacer(1, 10)])
+    elements.append(Paragraph(title, styles["Title"]))
+    elements.append(Paragraph("Entradas y resultados de la simulación", styles["Muted"]))
+    elements.append(Spacer(1, 10))
 
     inputs_rows = [
         ["Parametro", "Valor"],
@@ -108,6 +127,8 @@ def build_pdf_report(
         ["Numero de simulaciones (k)", str(inputs["n_simulations"])],
         ["Tamano de poblacion graficada", f"{inputs['population_size']:,}"],
     ]
+    if inputs.get("seed") is not None:
+        inputs_rows.append(["Semilla aleatoria", str(inputs["seed"])])
     elements.append(_build_table(inputs_rows, col_widths=[180, 330]))
     elements.append(Spacer(1, 16))
 
@@ -116,6 +137,9 @@ def build_pdf_report(
         ["Media", f"{theoretical['mean']:.4f}", f"{pop_empirical['mean']:.4f}", f"{pop_diff.get('mean', 0):.4f}"],
         ["Desviacion estandar", f"{theoretical['std']:.4f}", f"{pop_empirical['std']:.4f}", f"{pop_diff.get('std', 0):.4f}"],
     ]
+    if "median" in pop_empirical:
+        pop_table.append(["Mediana (emp.)", "-", f"{pop_empirical['median']:.4f}", "-"])
+        pop_table.append(["Percentiles 5% - 95% (emp.)", "-", f"{pop_empirical['p05']:.4f} - {pop_empirical['p95']:.4f}", "-"])
     elements.append(Paragraph("Población generada", styles["Heading2"]))
     elements.append(_build_table(pop_table))
     elements.append(Spacer(1, 12))
@@ -125,20 +149,158 @@ def build_pdf_report(
         ["Media", f"{theoretical['mean']:.4f}", f"{sample_empirical['mean']:.4f}", f"{means_diff['mean']:.4f}"],
         ["Error estandar / Desv.", f"{theoretical['se']:.4f}", f"{sample_empirical['std']:.4f}", f"{means_diff['std']:.4f}"],
     ]
+    if "p025" in sample_empirical:
+        # Banda del 95% central: la normal del TCL predice media +- 1.96 errores estandar.
+        band_low, band_high = theoretical["mean"] - 1.96 * theoretical["se"], theoretical["mean"] + 1.96 * theoretical["se"]
+        means_table.append(
+            [
+                "Banda central 95%",
+                f"{band_low:.4f} - {band_high:.4f}",
+                f"{sample_empirical['p025']:.4f} - {sample_empirical['p975']:.4f}",
+                f"{max(abs(sample_empirical['p025'] - band_low), abs(sample_empirical['p975'] - band_high)):.4f}",
+            ]
+        )
     elements.append(Paragraph("Medias muestrales", styles["Heading2"]))
     elements.append(_build_table(means_table))
     elements.append(Spacer(1, 16))
 
+    if diagnostics is not None:
+        diagnostics_table = [
+            ["Diagnostico", "Valor", "Referencia"],
+            ["Distancia KS", f"{diagnostics['ks']:.4f}", f"< {diagnostics['ks_critical']:.4f} (5%)"],
+            ["Anderson-Darling", f"{diagnostics['anderson_darling']:.3f}", "< 2.492 (5%)"],
+            ["Asimetria", f"{diagnostics['skewness']:.4f}", "0 (normal)"],
+            ["Curtosis (exceso)", f"{diagnostics['kurtosis']:.4f}", "0 (normal)"],
+            ["Cota de Berry-Esseen", f"{diagnostics['berry_esseen']:.4f}", "KS maximo teorico"],
+        ]
+        elements.append(Paragraph("Normalidad de las medias", styles["Heading2"]))
+        elements.append(_build_table(diagnostics_table))
+        elements.append(Spacer(1, 16))
+
     elements.append(Paragraph("Grafica de la poblacion", styles["Heading2"]))
     elements.append(_fig_to_image(fig_population))
     elements.append(Spacer(1, 10))
     elements.append(Paragraph("Grafica de las medias muestrales", styles["Heading2"]))
     elements.append(_fig_to_image(fig_means))
+    return elements
+
 
-    doc.build(
-        elements,
-        onFirstPage=lambda canvas, d: _draw_background(canvas, d, "#0d1523"),
-        onLaterPages=lambda canvas, d: _draw_background(canvas, d, "#0d1523"),
+def _build_document(elements: List[Any], title: str = "Reporte TCL") -> bytes:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=A4,
+        rightMargin=36,
+        leftMargin=36,
+        topMargin=42,
+        bottomMargin=42,
+        title=title,
     )
+    with profile_stage("pdf.maquetacion"):
+        doc.build(elements, onFirstPage=_draw_background, onLaterPages=_draw_background)
     buffer.seek(0)
     return buffer.getvalue()
+
+
+def build_pdf_report(
+    inputs: Dict[str, Any],
+    pop_empirical: Dict[str, float],
+    sample_empirical: Dict[str, float],
+    theoretical: Dict[str, float],
+    pop_diff: Dict[str, float],
+    means_diff: Dict[str, float],
+    fig_population,
+    fig_means,
+    diagnostics: Optional[Dict[str, float]] = None,
+) -> bytes:
+    """
+    Crea un PDF con resumen de entradas, metrica teorica/empirica y graficas.
+    fig_population y fig_means pueden ser figuras de matplotlib o PNG ya rasterizados (bytes).
+    diagnostics (ver core.metrics.compute_normality_diagnostics) agrega una tabla de normalidad de las medias.
+    Devuelve los bytes listos para descargar en Streamlit.
+    """
+    elements = _report_elements(
+        inputs, pop_empirical, sample_empirical, theoretical, pop_diff, means_diff, fig_population, fig_means, diagnostics
+    )
+    return _build_document(elements)
+
+
+def _rasterize_report(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia del reporte con las figuras convertidas a PNG (las que ya son bytes se dejan igual)."""
+    rasterized = dict(report)
+    for field in ("fig_population", "fig_means"):
+        figure = report[field]
+        if not isinstance(figure, (bytes, bytearray)):
+            rasterized[field] = figure_to_png(figure)
+    return rasterized
+
+
+def _write_report(report: Dict[str, Any], path: Optional[str]) -> Any:
+    """Arma un reporte completo; con path lo escribe en disco y devuelve la ruta (no viajan bytes entre procesos)."""
+    pdf = build_pdf_report(**_rasterize_report(report))
+    if path is None:
+        return pdf
+    with open(path, "wb") as handle:
+        handle.write(pdf)
+    return path
+
+
+def _map(func, items: Sequence[Any], n_workers: int, *extra: Sequence[Any]) -> List[Any]:
+    """map en orden, en serie o en un pool de procesos (las figuras de matplotlib se serializan con pickle)."""
+    if n_workers <= 1 or len(items) <= 1:
+        return [func(*args) for args in zip(items, *extra)]
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(n_workers, len(items))) as executor:
+        return list(executor.map(func, items, *extra))
+
+
+def build_pdf_reports(
+    reports: Sequence[Dict[str, Any]],
+    output_dir: Optional[str] = None,
+    n_workers: Optional[int] = None,
+    file_pattern: str = "reporte_tcl_{index:03d}.pdf",
+) -> List[Any]:
+    """
+    Genera un PDF por reporte en paralelo (un proceso por nucleo por defecto).
+    Cada reporte es un diccionario con los argumentos de build_pdf_report. Devuelve los bytes de cada PDF,
+    o las rutas escritas en output_dir si se indica (file_pattern recibe index y los campos de inputs).
+    Los estilos se construyen una vez por proceso y se reutilizan en todos sus reportes.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    paths: List[Optional[str]] = [None] * len(reports)
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+        paths = [
+            os.path.join(output_dir, file_pattern.format(index=index, **report["inputs"]))
+            for index, report in enumerate(reports)
+        ]
+    return _map(_write_report, reports, n_workers, paths)
+
+
+def build_combined_pdf_report(
+    reports: Sequence[Dict[str, Any]],
+    n_workers: Optional[int] = None,
+    title: str = "Reportes del Teorema Central del Limite",
+) -> bytes:
+    """
+    Un solo PDF con una seccion (que empieza en pagina nueva) por reporte.
+    Las figuras se rasterizan en paralelo; la maquetacion de un documento unico es secuencial.
+    """
+    from reportlab.platypus import PageBreak
+
+    n_workers = n_workers or os.cpu_count() or 1
+    # Etapa propia (tiempo de pared de la rasterizacion en paralelo): cada PNG ya se registra como pdf.png.
+    with profile_stage("pdf.rasterize"):
+        rasterized = _map(_rasterize_report, reports, n_workers)
+    elements: List[Any] = []
+    for index, report in enumerate(rasterized):
+        if index:
+            elements.append(PageBreak())
+        inputs = report["inputs"]
+        section = f"{index + 1}. {inputs['dist_name']} ({_format_params(inputs['dist_name'], inputs['dist_params'])})"
+        elements.extend(_report_elements(title=section, **report))
+    return _build_document(elements, title=title)